@@ -0,0 +1,220 @@
+import os
+import sys
+import time
+import json
+import random
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import importlib.util
+
+import kiepscy_core as core
+
+WORDS = [
+    "ferdynand", "kiepski", "halina", "boczek", "paździoch", "mariolka", "waldek", "babka", "piwo", "świat",
+    "według", "kiepskich", "odbiornik", "żyje", "umarł", "wielki", "mały", "sąsiad", "łapówka", "wczasy",
+    "telewizor", "kuchnia", "pieniądze", "polityka", "mecz", "wesele", "spadek", "lekarz", "gołębie", "jubileusz",
+]
+QUERIES = ["1234", "paździoch", "zdziocha", "wielki mecz"]
+PICKS = 10000
+
+def make_catalog(path, episodes, per_season=40, mirror_every=10, seed=0):
+    # Same shape as links.txt: tab-indented URLs, a blank line between episodes, some mirrors
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as file:
+        for n in range(episodes):
+            if n % per_season == 0:
+                file.write(f"\t\t\tSEZON {n // per_season + 1}\n\n")
+            title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).capitalize()
+            digest = "%032x" % rng.getrandbits(128)
+            file.write(f"{n + 1}. {title}\n\thttp://cdn{n % 4}.example.pl/p/movies/{digest[:2]}/{digest}.mp4\n")
+            if n % mirror_every == 0:
+                file.write(f"\thttp://mirror.example.pl/{digest}.mp4\n")
+            file.write("\n")
+
+def timed(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+def summary(runs, count=1):
+    # Per-operation seconds; count > 1 divides batched runs down to one call
+    runs = [run / count for run in runs]
+    return {"median_s": statistics.median(runs), "min_s": min(runs), "max_s": max(runs), "runs": len(runs)}
+
+def bench_catalog(path, repeat):
+    results = {}
+    cache = core.catalog_cache_path(path)
+
+    def parse():
+        with open(path, "r", encoding="utf-8") as file:
+            return list(core.iter_links(file.read().splitlines()))
+
+    def load_cold():
+        if os.path.exists(cache):
+            os.remove(cache)
+        list(core.iter_catalog(path))
+
+    results["parse"] = summary(timed(parse, repeat))
+    results["load_cold"] = summary(timed(load_cold, repeat))
+    results["load_cached"] = summary(timed(lambda: list(core.iter_catalog(path)), repeat))
+    items = parse()
+    results["flatten"] = summary(timed(lambda: core.EpisodeCatalog.from_items(items), repeat))
+    catalog = core.EpisodeCatalog.from_items(items)
+    names = [episode.name for episode in catalog.episodes]
+    results["search_index"] = summary(timed(lambda: core.SearchIndex(names), repeat))
+
+    # Every prefix of every query is one keystroke, replayed the way the search entry issues them
+    index = core.SearchIndex(names)
+    keystrokes = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            index.search("")
+            for end in range(1, len(query) + 1):
+                start = time.perf_counter()
+                index.search(query[:end])
+                keystrokes.append(time.perf_counter() - start)
+    results["search_keystroke"] = summary(keystrokes)
+
+    rng = random.Random(1)
+    episodes = catalog.episodes
+
+    def pick():
+        for _ in range(PICKS):
+            rng.choice(episodes).url
+    results["random_pick"] = summary(timed(pick, repeat), PICKS)
+
+    def lookup():
+        for _ in range(PICKS):
+            catalog.by_number(rng.randint(1, len(episodes)))
+    results["by_number"] = summary(timed(lookup, repeat), PICKS)
+    if os.path.exists(cache):
+        os.remove(cache)
+    return results, names
+
+def start_virtual_display():
+    # Xvfb stands in for a real screen so the Tk benchmark runs on CI and over SSH
+    if os.environ.get("DISPLAY"):
+        return None, None
+    if not shutil.which("Xvfb"):
+        return None, "no DISPLAY and Xvfb is not installed"
+    display = ":%d" % (90 + os.getpid() % 100)
+    process = subprocess.Popen(["Xvfb", display, "-screen", "0", "1024x768x24"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1.0)
+    os.environ["DISPLAY"] = display
+    return process, None
+
+def load_gui():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kiepscy-gui.py")
+    spec = importlib.util.spec_from_file_location("kiepscy_gui", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def bench_tk(names, repeat, frames=200):
+    import tkinter as tk
+    gui = load_gui()
+    root = tk.Tk()
+    root.geometry("800x600")
+    canvas = tk.Canvas(root, bg="black", highlightthickness=0)
+    canvas.pack(fill=tk.BOTH, expand=True)
+    root.update()
+    episode_list = gui.VirtualEpisodeList(canvas, "#32CD32", "#90EE90")
+    font = ("TkDefaultFont", 12, "bold")
+    results = {}
+
+    def set_rows():
+        episode_list.set_rows(names, font, lambda row: None)
+        root.update_idletasks()
+    results["list_set_rows"] = summary(timed(set_rows, repeat))
+
+    scrolls = []
+    for _ in range(repeat):
+        for step in range(frames):
+            start = time.perf_counter()
+            canvas.yview_moveto(step / frames)
+            episode_list.refresh()
+            root.update_idletasks()
+            scrolls.append(time.perf_counter() - start)
+    results["list_scroll_frame"] = summary(scrolls)
+    root.destroy()
+    return results
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(report, baseline_path, threshold):
+    with open(baseline_path, "r", encoding="utf-8") as file:
+        baseline = json.load(file)
+    regressions = 0
+    for size, ops in report["results"].items():
+        for op, result in ops.items():
+            old = baseline.get("results", {}).get(size, {}).get(op)
+            if not old or not old["median_s"]:
+                continue
+            ratio = result["median_s"] / old["median_s"]
+            flag = "REGRESSION" if ratio > threshold else ""
+            regressions += bool(flag)
+            print(f"{size:>8} {op:<18} {old['median_s'] * 1000:10.3f} ms -> {result['median_s'] * 1000:10.3f} ms  x{ratio:.2f} {flag}",
+                  file=sys.stderr)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kiepskie GUI benchmarks")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000", help="comma-separated catalog sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement")
+    parser.add_argument("--tk", action="store_true", help="also time the episode list under a (virtual) display")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="earlier JSON report to compare medians against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": {},
+    }
+    display, skipped = start_virtual_display() if args.tk else (None, None)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for size in [int(size) for size in args.sizes.split(",")]:
+                path = os.path.join(directory, f"links_{size}.txt")
+                make_catalog(path, size)
+                results, names = bench_catalog(path, args.repeat)
+                if args.tk and not skipped:
+                    results.update(bench_tk(names, args.repeat))
+                report["results"][str(size)] = results
+                print(f"{size} episodes done", file=sys.stderr)
+    finally:
+        if display:
+            display.terminate()
+    if skipped:
+        report["tk_skipped"] = skipped
+
+    text = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        return 1 if compare(report, args.compare, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,47 +1,603 @@
+import time
+STARTUP_T0 = time.perf_counter()
+
 import os
-import re
+import sys
+import argparse
+import urllib.parse
+import io
+import tempfile
 import random
+import queue
+import threading
+from collections import OrderedDict, defaultdict
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
-import vlc
 import tkinter.font as tkfont
 
-def load_links(file_path):
-    if not os.path.exists(file_path):
-        messagebox.showerror("Error", f"File '{file_path}' not found.")
+# Everything that does not need Tk lives in kiepscy_core; Pillow still loads on first use
+from kiepscy_core import (
+    load_vlc, iter_catalogs, EpisodeCatalog, LinkChecker, load_link_health, save_link_health,
+    run_link_check, SourceSelector, DownloadManager, ConnectionWarmer, THUMBNAIL_DIR, THUMBNAIL_SIZE, ThumbnailCache,
+    CachingProxy, SearchIndex, PlaybackTelemetry, HostCachingPolicy, WatchHistory, PlaybackState,
+)
+
+def format_time(ms):
+    seconds = int(ms // 1000)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}" if seconds >= 3600 else f"{seconds // 60}:{seconds % 60:02d}"
+
+class ThumbnailLoader:
+    # Disk cache first, then a headless libvlc snapshot; only rows the list asks for get queued
+    SNAPSHOT_POSITION = 0.2
+    SNAPSHOT_TIMEOUT = 20.0
+    PENDING_LIMIT = 32
+    PHOTO_CACHE_SIZE = 200
+
+    def __init__(self, root, on_ready, cache_dir=THUMBNAIL_DIR, max_bytes=64 * 1024 * 1024, workers=2):
+        self.root = root
+        self.on_ready = on_ready
+        self.cache = ThumbnailCache(cache_dir, max_bytes)
+        self.photos = OrderedDict()
+        self.pending = []
+        self.requested = set()
+        self.failed = set()
+        self.condition = threading.Condition()
+        self.results = queue.Queue()
+        self.instance = None
+        self._instance_lock = threading.Lock()
+        self._poll_job = None
+        for _ in range(workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def get(self, url, location):
+        if url in self.photos:
+            self.photos.move_to_end(url)
+            return self.photos[url]
+        if url in self.failed:
+            return None
+        with self.condition:
+            if url not in self.requested:
+                # Newest requests are served first; rows scrolled past long ago fall off the bottom
+                if len(self.pending) >= self.PENDING_LIMIT:
+                    stale, _ = self.pending.pop(0)
+                    self.requested.discard(stale)
+                self.pending.append((url, location))
+                self.requested.add(url)
+                self.condition.notify()
+        if not self._poll_job:
+            self._poll_job = self.root.after(100, self._poll)
         return None
-    seasons = {}
-    current_season = None
-    current_name = None
-    url_pattern = re.compile(r"^https?://")
-    try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            for line in file:
-                line = line.strip()
-                if not line:
+
+    def _worker(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                url, location = self.pending.pop()
+            try:
+                data = self.cache.get(url, 0)
+                if data is None:
+                    data = self._capture(location)
+                    if data is not None:
+                        self.cache.put(url, 0, data)
+            except Exception as e:
+                print(f"Error creating thumbnail: {e}")
+                data = None
+            self.results.put((url, data))
+
+    def _vlc_instance(self):
+        with self._instance_lock:
+            if self.instance is None:
+                self.instance = load_vlc().Instance("--intf=dummy", "--vout=dummy", "--no-audio", "--quiet")
+            return self.instance
+
+    def _capture(self, location):
+        from PIL import Image
+        vlc = load_vlc()
+        player = self._vlc_instance().media_player_new()
+        player.set_media(self._vlc_instance().media_new(location, ":no-audio"))
+        handle, snapshot = tempfile.mkstemp(suffix=".png")
+        os.close(handle)
+        os.remove(snapshot)
+        try:
+            player.play()
+            deadline = time.monotonic() + self.SNAPSHOT_TIMEOUT
+            seeked = False
+            while time.monotonic() < deadline:
+                time.sleep(0.1)
+                if player.get_state() in (vlc.State.Error, vlc.State.Ended):
+                    return None
+                if not seeked:
+                    if player.get_length() > 0:
+                        player.set_position(self.SNAPSHOT_POSITION)
+                        seeked = True
+                elif player.get_time() > 0 and player.video_take_snapshot(0, snapshot, THUMBNAIL_SIZE[0] * 2, 0) == 0:
+                    if os.path.exists(snapshot):
+                        break
+            else:
+                return None
+            with Image.open(snapshot) as image:
+                image = image.convert("RGB")
+                image.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+                output = io.BytesIO()
+                image.save(output, "JPEG", quality=80)
+                return output.getvalue()
+        finally:
+            player.stop()
+            player.release()
+            if os.path.exists(snapshot):
+                os.remove(snapshot)
+
+    def _poll(self):
+        from PIL import Image, ImageTk
+        self._poll_job = None
+        ready = []
+        try:
+            while True:
+                url, data = self.results.get_nowait()
+                with self.condition:
+                    self.requested.discard(url)
+                if data is None:
+                    self.failed.add(url)
                     continue
-                if re.match(r"SEZON\s+\d+", line, re.IGNORECASE):
-                    current_season = line
-                    seasons[current_season] = []
-                    current_name = None
-                elif url_pattern.match(line):
-                    if current_season and current_name:
-                        seasons[current_season].append((current_name, line))
-                        current_name = None
+                self.photos[url] = ImageTk.PhotoImage(Image.open(io.BytesIO(data)))
+                while len(self.photos) > self.PHOTO_CACHE_SIZE:
+                    self.photos.popitem(last=False)
+                ready.append(url)
+        except queue.Empty:
+            pass
+        if ready:
+            self.on_ready(ready)
+        with self.condition:
+            busy = bool(self.requested)
+        if busy:
+            self._poll_job = self.root.after(100, self._poll)
+
+class VirtualEpisodeList:
+    # Fixed pool of canvas text items rebound to rows as the view scrolls
+    def __init__(self, canvas, text_color, hover_color, padx=5, pady=2):
+        self.canvas = canvas
+        self.text_color = text_color
+        self.hover_color = hover_color
+        self.padx = padx
+        self.pady = pady
+        self.font = None
+        self.row_height = 1
+        self.top = 0
+        self.rows = []
+        self.colors = None
+        self.on_select = None
+        self.on_context = None
+        self.on_hover = None
+        self.pool = []
+        self.image_pool = []
+        self.item_rows = {}
+        self.row_items = {}
+        self.thumbnails = None
+        self.note_item = None
+        self._row_heights = {}
+
+        canvas.tag_bind("list_row", "<Enter>", self.on_row_enter)
+        canvas.tag_bind("list_row", "<Leave>", self.on_row_leave)
+        canvas.tag_bind("list_row", "<Button-1>", self.on_row_click)
+        canvas.tag_bind("list_row", "<Button-3>", self.on_row_context)
+        canvas.bind("<Configure>", lambda e: self.refresh(), add="+")
+
+    def set_rows(self, rows, font, on_select=None, note=None, keep_view=False, colors=None, on_context=None,
+                 thumbnails=None, on_hover=None):
+        # thumbnails(row) returns a PhotoImage or None; it is only called for rows on screen
+        view = self.canvas.yview()[0]
+        self.clear()
+        self.rows = rows
+        self.colors = colors
+        self.on_select = on_select
+        self.on_context = on_context
+        self.on_hover = on_hover
+        self.thumbnails = thumbnails
+        if font != self.font:
+            self.font = font
+            if font not in self._row_heights:
+                self._row_heights[font] = tkfont.Font(font=font).metrics("linespace") + 2 * self.pady
+            for item in self.pool:
+                self.canvas.itemconfig(item, font=font)
+        self.row_height = self._row_heights[font]
+        if thumbnails:
+            self.row_height = max(self.row_height, THUMBNAIL_SIZE[1] + 2 * self.pady)
+        if note:
+            x, y = self._note_position()
+            self.note_item = self.canvas.create_text(
+                x, y, text=note, font=font, fill="white", anchor=tk.N
+            )
+        self.update_scrollregion()
+        self.canvas.yview_moveto(view if keep_view else 0)
+        self.refresh()
+
+    def clear(self):
+        self.rows = []
+        self.colors = None
+        self.on_select = None
+        self.on_context = None
+        self.on_hover = None
+        self.thumbnails = None
+        if self.note_item:
+            self.canvas.delete(self.note_item)
+            self.note_item = None
+        self.update_scrollregion()
+        self.refresh()
+
+    def _note_position(self):
+        return max(self.canvas.winfo_width() // 2, 1), self.top + len(self.rows) * self.row_height + 10
+
+    def set_top(self, top):
+        if top != self.top:
+            self.top = top
+            if self.note_item:
+                self.canvas.coords(self.note_item, *self._note_position())
+        self.update_scrollregion()
+        self.refresh()
+
+    def update_scrollregion(self):
+        height = self.top + len(self.rows) * self.row_height + self.pady
+        if self.note_item:
+            height += self.row_height + 10
+        width = max(self.canvas.winfo_width(), 1)
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+
+    def refresh(self):
+        if self.font is None:
+            return
+        visible = int(self.canvas.winfo_height() // self.row_height) + 2
+        while len(self.pool) < visible:
+            self.pool.append(self.canvas.create_text(
+                self.padx, 0, text="", font=self.font, fill=self.text_color,
+                anchor=tk.W, state="hidden", tags=("list_row",)
+            ))
+            self.image_pool.append(self.canvas.create_image(
+                self.padx, 0, anchor=tk.W, state="hidden", tags=("list_row",)
+            ))
+        first = max(0, int((self.canvas.canvasy(0) - self.top) // self.row_height))
+        current = self.canvas.find_withtag(tk.CURRENT)
+        text_x = self.padx + (THUMBNAIL_SIZE[0] + self.padx if self.thumbnails else 0)
+        self.item_rows.clear()
+        self.row_items.clear()
+        for slot, (item, image_item) in enumerate(zip(self.pool, self.image_pool)):
+            row = first + slot
+            if row < len(self.rows):
+                y = self.top + row * self.row_height + self.row_height / 2
+                self.canvas.coords(item, text_x, y)
+                fill = self.hover_color if item in current or image_item in current else self.row_color(row)
+                self.canvas.itemconfig(item, text=self.rows[row], fill=fill, state="normal")
+                self.item_rows[item] = row
+                self.row_items[row] = item
+                photo = self.thumbnails(row) if self.thumbnails else None
+                if photo is not None:
+                    self.canvas.coords(image_item, self.padx, y)
+                    self.canvas.itemconfig(image_item, image=photo, state="normal")
+                    self.item_rows[image_item] = row
                 else:
-                    current_name = line
-    except Exception as e:
-        messagebox.showerror("Error Reading File", f"An error occurred: {e}")
-        return None
-    if not seasons:
-        messagebox.showinfo("Info", "No seasons or episodes found.")
-        return None
-    return seasons
+                    self.canvas.itemconfig(image_item, image="", state="hidden")
+            else:
+                self.canvas.itemconfig(item, state="hidden")
+                self.canvas.itemconfig(image_item, image="", state="hidden")
+
+    def row_color(self, row):
+        if self.colors and self.colors[row]:
+            return self.colors[row]
+        return self.text_color
+
+    def _current_row(self):
+        item_id = self.canvas.find_withtag(tk.CURRENT)
+        if item_id and item_id[0] in self.item_rows:
+            row = self.item_rows[item_id[0]]
+            return self.row_items[row], row
+        return None, None
+
+    def on_row_enter(self, event):
+        item, row = self._current_row()
+        if item is not None:
+            self.canvas.itemconfig(item, fill=self.hover_color)
+            if self.on_hover:
+                self.on_hover(row)
+
+    def on_row_leave(self, event):
+        item, row = self._current_row()
+        if item is not None:
+            self.canvas.itemconfig(item, fill=self.row_color(row))
+        if self.on_hover:
+            self.on_hover(None)
+
+    def on_row_click(self, event):
+        item, row = self._current_row()
+        if row is not None and self.on_select:
+            self.on_select(row)
+
+    def on_row_context(self, event):
+        item, row = self._current_row()
+        if row is not None and self.on_context:
+            self.on_context(row)
+
+class BackgroundScaler:
+    # Cheap preview now, LANCZOS on a worker thread, recent sizes kept as PhotoImages
+    CACHE_SIZE = 4
+    PREVIEW_MAX = 480
+
+    def __init__(self, root, image_path, on_ready):
+        self.root = root
+        self.image_path = image_path
+        self.image = None
+        self.preview_source = None
+        self.on_ready = on_ready
+        self.photos = OrderedDict()
+        self.wanted = None
+        self.pending = None
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.results = queue.Queue()
+        self.failed = False
+        self._poll_job = None
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def get(self, size):
+        # After a failed load the canvas just keeps its plain background
+        if self.failed:
+            return None
+        self.wanted = size
+        if size in self.photos:
+            self.photos.move_to_end(size)
+            return self.photos[size]
+        with self.lock:
+            self.pending = size
+        self.wakeup.set()
+        if not self._poll_job:
+            self._poll_job = self.root.after(30, self._poll)
+        if self.preview_source is None:
+            return None
+        from PIL import Image, ImageTk
+        return ImageTk.PhotoImage(self.preview_source.resize(size, Image.Resampling.BILINEAR))
+
+    def _worker(self):
+        # Decoding the full-resolution PNG happens here too, never before first paint
+        try:
+            from PIL import Image
+            image = Image.open(self.image_path)
+            image.load()
+            preview = image.copy()
+            preview.thumbnail((self.PREVIEW_MAX, self.PREVIEW_MAX))
+            self.image, self.preview_source = image, preview
+        except Exception as e:
+            print(f"Error loading background: {e}")
+            self.results.put((None, None))
+            return
+        while True:
+            self.wakeup.wait()
+            with self.lock:
+                size, self.pending = self.pending, None
+                self.wakeup.clear()
+            if size is None:
+                continue
+            try:
+                self.results.put((size, self.image.resize(size, Image.Resampling.LANCZOS)))
+            except Exception as e:
+                print(f"Error scaling background: {e}")
+                self.results.put((size, None))
+
+    def _poll(self):
+        self._poll_job = None
+        done = False
+        try:
+            while True:
+                size, img = self.results.get_nowait()
+                if img is None:
+                    if size is None:
+                        self.failed = True
+                        return
+                    done = size == self.wanted
+                    continue
+                from PIL import ImageTk
+                self.photos[size] = ImageTk.PhotoImage(img)
+                self.photos.move_to_end(size)
+                while len(self.photos) > self.CACHE_SIZE:
+                    self.photos.popitem(last=False)
+                if size == self.wanted:
+                    self.on_ready(self.photos[size])
+        except queue.Empty:
+            pass
+        if not done and self.wanted not in self.photos:
+            self._poll_job = self.root.after(30, self._poll)
+
+class CanvasLayout:
+    # Remembers each item's relative position and base font so resizes only move/rescale it
+    REFERENCE_SIZE = (800, 600)
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.items = {}
+        self.scale = 1.0
+
+    def _size(self):
+        return max(self.canvas.winfo_width(), 1), max(self.canvas.winfo_height(), 1)
+
+    def _current_scale(self):
+        w, h = self._size()
+        if w <= 1 or h <= 1:
+            return 1.0
+        return min(w / self.REFERENCE_SIZE[0], h / self.REFERENCE_SIZE[1])
+
+    def _font(self, font):
+        family, size, *style = font
+        return (family, max(6, round(size * self.scale)), *style)
+
+    def create_text(self, relx, rely, font, **options):
+        if not self.items:
+            self.scale = self._current_scale()
+        w, h = self._size()
+        item = self.canvas.create_text(relx * w, rely * h, font=self._font(font), **options)
+        self.items[item] = (relx, rely, font)
+        return item
+
+    def delete(self, tag):
+        for item in self.canvas.find_withtag(tag):
+            self.items.pop(item, None)
+        self.canvas.delete(tag)
+
+    def relayout(self):
+        w, h = self._size()
+        scale = self._current_scale()
+        rescale = abs(scale - self.scale) > 0.01
+        self.scale = scale
+        for item, (relx, rely, font) in self.items.items():
+            self.canvas.coords(item, relx * w, rely * h)
+            if rescale:
+                self.canvas.itemconfig(item, font=self._font(font))
+
+class InputScheduler:
+    # Merges bursts of keyboard/mouse input into at most one VLC or Tk call per interval
+    SEEK_INTERVAL_MS = 200
+    VOLUME_INTERVAL_MS = 80
+    OVERLAY_HIDE_MS = 3000
+
+    def __init__(self, root, apply_seek, apply_seek_to, apply_volume, on_overlay_timeout):
+        self.root = root
+        self.apply_seek = apply_seek
+        self.apply_seek_to = apply_seek_to
+        self.apply_volume = apply_volume
+        self.on_overlay_timeout = on_overlay_timeout
+        self.seek_delta = 0
+        self.seek_position = None
+        self.volume_delta = 0
+        self.overlay_deadline = 0.0
+        self._seek_job = None
+        self._volume_job = None
+        self._overlay_job = None
+
+    def request_seek(self, seconds):
+        self.seek_delta += seconds
+        if self._seek_job is None:
+            self._seek_job = self.root.after(self.SEEK_INTERVAL_MS, self._flush_seek)
+
+    def request_seek_to(self, position):
+        # Seekbar drags: only the latest absolute target survives, and it replaces queued relative steps
+        self.seek_position = position
+        self.seek_delta = 0
+        if self._seek_job is None:
+            self._seek_job = self.root.after(self.SEEK_INTERVAL_MS, self._flush_seek)
+
+    def flush_seek(self):
+        if self._seek_job is not None:
+            self.root.after_cancel(self._seek_job)
+            self._flush_seek()
+
+    def _flush_seek(self):
+        self._seek_job = None
+        position, self.seek_position = self.seek_position, None
+        delta, self.seek_delta = self.seek_delta, 0
+        if position is not None:
+            self.apply_seek_to(position)
+        if delta:
+            self.apply_seek(delta)
+
+    def request_volume(self, step):
+        self.volume_delta += step
+        if self._volume_job is None:
+            self._volume_job = self.root.after(self.VOLUME_INTERVAL_MS, self._flush_volume)
+
+    def _flush_volume(self):
+        self._volume_job = None
+        delta, self.volume_delta = self.volume_delta, 0
+        if delta:
+            self.apply_volume(delta)
+
+    def touch_overlay(self):
+        # Motion only moves the deadline; one timer chases it instead of one per event
+        self.overlay_deadline = time.monotonic() + self.OVERLAY_HIDE_MS / 1000
+        if self._overlay_job is None:
+            self._overlay_job = self.root.after(self.OVERLAY_HIDE_MS, self._check_overlay)
+
+    def _check_overlay(self):
+        remaining = self.overlay_deadline - time.monotonic()
+        if remaining > 0.01:
+            self._overlay_job = self.root.after(int(remaining * 1000) + 1, self._check_overlay)
+            return
+        self._overlay_job = None
+        self.on_overlay_timeout()
+
+    def cancel_overlay(self):
+        if self._overlay_job is not None:
+            self.root.after_cancel(self._overlay_job)
+            self._overlay_job = None
+
+class HandlerProfiler:
+    # Every command, binding, trace and after job reaches Python through tk.CallWrapper
+    def __init__(self, budget_ms=50, dump_path=None):
+        self.budget = budget_ms / 1000
+        self.dump_path = dump_path
+        self.stats = {}
+        self.profile = None
+        self._original = None
+
+    def install(self):
+        original = self._original = tk.CallWrapper.__call__
+        profiler = self
+
+        def __call__(wrapper, *args):
+            start = time.perf_counter()
+            try:
+                return original(wrapper, *args)
+            finally:
+                profiler.record(wrapper.func, time.perf_counter() - start)
+        tk.CallWrapper.__call__ = __call__
+        if self.dump_path:
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    @staticmethod
+    def handler_name(func):
+        # after() hides the job inside a callit closure; report the function it wraps
+        code = getattr(func, "__code__", None)
+        if code is not None and code.co_name == "callit" and "func" in code.co_freevars:
+            func = func.__closure__[code.co_freevars.index("func")].cell_contents
+        func = getattr(func, "func", func)
+        code = getattr(func, "__code__", None)
+        name = getattr(func, "__qualname__", None) or repr(func)
+        if code is not None and "<lambda>" in name:
+            name += f" ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return name
+
+    def record(self, func, seconds):
+        name = self.handler_name(func)
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = [0, 0.0, 0.0, 0]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+        if seconds > self.budget:
+            stats[3] += 1
+            print(f"Slow handler: {name} blocked the UI for {seconds * 1000:.0f} ms")
+
+    def finish(self):
+        if self._original is not None:
+            tk.CallWrapper.__call__ = self._original
+            self._original = None
+        print(f"{'handler':<60} {'calls':>7} {'total ms':>10} {'max ms':>8} {'slow':>5}")
+        for name, (calls, total, worst, slow) in sorted(self.stats.items(), key=lambda item: -item[1][1])[:25]:
+            print(f"{name[:60]:<60} {calls:>7} {total * 1000:>10.1f} {worst * 1000:>8.1f} {slow:>5}")
+        if self.profile is not None:
+            self.profile.disable()
+            self.profile.dump_stats(self.dump_path)
+            print(f"cProfile stats written to {self.dump_path}")
 
 class EpisodePlayerApp:
-    def __init__(self, root):
+    PLAYBACK_FRAME_MS = 50
+    STALL_FAILOVER = 3
+    HOVER_WARMUP_MS = 300
+
+    def __init__(self, root, catalog_files=("links.txt",), max_download_rate=None, proxy=None, profile_startup=False,
+                 thumbnails=False, thumbnail_cache_mb=64, warmup=True):
         self.root = root
+        self.profile_startup = profile_startup
+        self.startup_marks = {}
         self.root.title("Kiepskie GUI")
         self.root.geometry("800x600")
         self.root.configure(bg="black")
@@ -54,47 +610,101 @@ class EpisodePlayerApp:
         self.font_path = os.path.join(script_dir, "BoinkLETPlain.ttf")
 
         # Register custom font
-        try:
-            self.custom_font = tkfont.Font(family="BoinkLETPlain", size=14)
-            tkfont.Font(root=root, font=self.custom_font)
-            root.tk.call('font', 'create', 'BoinkLETPlain', '-family', 'BoinkLETPlain', '-size', 14)
-        except:
-            pass
-        try:
-            root.tk.call('font', 'create', 'boinklet', '-family', 'BoinkLETPlain', '-size', 14)
-        except tk.TclError:
+        if 'boinklet' not in root.tk.splitlist(root.tk.call('font', 'names')):
             try:
                 root.tk.call('font', 'create', 'boinklet', '-family', 'BoinkLETPlain', '-size', 14)
-            except:
+            except tk.TclError:
                 pass
         self.font_name = "boinklet"
 
-        self.txt_file = "links.txt"
-        self.seasons_data = None
+        self.catalog_files = list(catalog_files)
+        self.catalog = EpisodeCatalog()
+        self.search_index = SearchIndex()
+        self._search_job = None
+        self.catalog_queue = queue.Queue()
+        self.catalog_loading = True
+        self.catalog_failed = False
+        self._pending_random = False
+        self.current_screen = None
 
         self.bg_image_path = os.path.join(script_dir, "kiepskie_background.png")
 
         self.text_color = "#32CD32"
         self.hover_color = "#90EE90"
+        self.dead_color = "#FF6347"
+
+        self.link_health = load_link_health()
+        self.link_checker = None
+        self.link_check_queue = queue.Queue()
+        self.link_check_progress = (0, 0)
+        self.sources = SourceSelector(self.link_health)
+        self.source_queue = queue.Queue()
+
+        self.downloads = DownloadManager(max_rate=max_download_rate)
+        self.proxy = proxy
+        self.thumbnails = None
+        if thumbnails:
+            self.thumbnails = ThumbnailLoader(
+                root, lambda urls: self.tv_list.refresh(), max_bytes=thumbnail_cache_mb * 1024 * 1024
+            )
+        self.warmer = ConnectionWarmer(proxy) if warmup else None
+        self._hover_job = None
+        self._downloads_job = None
+        self._download_speed = {}
 
         self.ui_elements = {}
 
         self.canvas = tk.Canvas(root, bg="black", highlightthickness=0)
         self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.layout = CanvasLayout(self.canvas)
 
-        self.load_background()
-
+        # The TV area and menu are built on the first real geometry; heavy work waits for that paint
+        self.canvas.bind("<Configure>", self.on_first_configure)
         self.root.bind("<Configure>", self.on_resize)
-        self.root.after(100, self.setup_tv_area)
+
+        threading.Thread(target=self._load_catalog_worker, daemon=True).start()
+        self.root.after(50, self._drain_catalog_queue)
 
         self.canvas.tag_bind("clickable_text", "<Enter>", self.on_text_enter)
         self.canvas.tag_bind("clickable_text", "<Leave>", self.on_text_leave)
         self.canvas.tag_bind("clickable_text", "<Button-1>", self.on_text_click)
 
-        self.vlc_instance = vlc.Instance()
+        self.vlc_instance = None
+        self._vlc_instance_lock = threading.Lock()
         self.vlc_player = None
         self.video_playing = False
+        self.play_queue = []
+        self.play_queue_pos = None
+        self.preloaded = None
+        self.playback = PlaybackState()
+        self._playback_job = None
+        self._seekbar_value = 0.0
+        self._seekbar_dragging = False
+        self._switch_started = None
+        self._switch_kind = "cold"
+        self.switch_latencies = defaultdict(list)
+        self.input = InputScheduler(self.root, self.apply_seek, self.apply_seek_to, self.apply_volume, self.hide_overlay_controls)
+        self._seek_target = None
+        self._volume = None
+        self._overlay_visible = False
         self.fullscreen_mode = False
+        self.telemetry = PlaybackTelemetry()
+        self.host_policy = HostCachingPolicy()
+        self._host_session = None
+        self.current_link = None
+        self.current_source = None
+        self.current_media = None
+        self._window_title = None
+        self._play_sources = []
+        self._failed_sources = set()
+        self._play_serial = 0
+        self.history = WatchHistory()
+        self._history_time = None
+        self._resume_pending = None
+        self._resume_target = None
+        self.root.after(100, self._poll_history_loaded)
+        self._telemetry_job = None
+        self.hud_visible = False
 
         # Controls frame (hidden initially)
         self.controls_frame = tk.Frame(self.root, bg="#4e4e4e")
@@ -116,6 +726,16 @@ class EpisodePlayerApp:
         self.fullscreen_btn = tk.Button(self.controls_frame, text="⛶", command=self.toggle_fullscreen)
         self.fullscreen_btn.pack(side="left", padx=5, pady=5)
 
+        self.next_btn = tk.Button(self.controls_frame, text="⏭", command=self.play_next_episode)
+        self.next_btn.pack(side="left", padx=5, pady=5)
+
+        self.autoplay_var = tk.BooleanVar(value=True)
+        self.autoplay_check = tk.Checkbutton(
+            self.controls_frame, text="Autoplay", variable=self.autoplay_var,
+            bg="#4e4e4e", fg="white", selectcolor="#4e4e4e", activebackground="#4e4e4e"
+        )
+        self.autoplay_check.pack(side="left", padx=5, pady=5)
+
         self.seek_var = tk.DoubleVar()
         self.seekbar = tk.Scale(
             self.controls_frame,
@@ -127,6 +747,8 @@ class EpisodePlayerApp:
             command=self.on_seek
         )
         self.seekbar.pack(side="left", padx=5, pady=5)
+        self.seekbar.bind("<ButtonPress-1>", lambda e: setattr(self, "_seekbar_dragging", True))
+        self.seekbar.bind("<ButtonRelease-1>", self.on_seek_release)
 
         # Overlay controls for fullscreen
         self.overlay_controls = tk.Frame(self.root, bg="#4e4e4e")
@@ -147,6 +769,9 @@ class EpisodePlayerApp:
         self.fullscreen_btn2 = tk.Button(self.overlay_controls, text="⛶", command=self.toggle_fullscreen)
         self.fullscreen_btn2.pack(side="left", padx=5, pady=5)
 
+        self.next_btn2 = tk.Button(self.overlay_controls, text="⏭", command=self.play_next_episode)
+        self.next_btn2.pack(side="left", padx=5, pady=5)
+
         # Keybinds
         root.bind("<Left>", lambda e: self.seek_relative(-10))
         root.bind("<Right>", lambda e: self.seek_relative(10))
@@ -154,32 +779,85 @@ class EpisodePlayerApp:
         root.bind("<Up>", lambda e: self.volume_up())
         root.bind("<Down>", lambda e: self.volume_down())
         root.bind("f", lambda e: self.toggle_fullscreen())
+        root.bind("i", lambda e: self.toggle_hud(e))
+
+        # Playback telemetry HUD (hidden initially)
+        self.hud_label = tk.Label(
+            self.root, font=("Courier", 10), justify="left", anchor="nw",
+            fg=self.text_color, bg="black", padx=6, pady=4
+        )
 
         root.bind("<Motion>", self.show_overlay_controls)
 
-    def load_background(self):
+    def on_first_configure(self, event):
+        self.canvas.unbind("<Configure>")
+        self.setup_tv_area()
+        self.root.after_idle(self.after_first_paint)
+
+    def after_first_paint(self):
+        self.mark_startup("first_paint")
+        self.load_background()
+        threading.Thread(target=self._warm_up_vlc, daemon=True).start()
+        self.root.after(50, self._check_interactive)
+
+    def _warm_up_vlc(self):
         try:
-            if not os.path.exists(self.bg_image_path):
-                print(f"Image not found: {self.bg_image_path}")
-                return
-            self.original_image = Image.open(self.bg_image_path)
-            self.update_background_display()
+            self.get_vlc_instance()
+            self.startup_marks.setdefault("vlc_ready", time.perf_counter() - STARTUP_T0)
         except Exception as e:
-            print(f"Error loading background: {e}")
+            print(f"Error starting VLC: {e}")
+            self.startup_marks.setdefault("vlc_failed", time.perf_counter() - STARTUP_T0)
+
+    def get_vlc_instance(self):
+        # libvlc plugin scanning is slow; it runs in the background after first paint
+        with self._vlc_instance_lock:
+            if self.vlc_instance is None:
+                self.vlc_instance = load_vlc().Instance()
+            return self.vlc_instance
+
+    def mark_startup(self, name):
+        self.startup_marks.setdefault(name, time.perf_counter() - STARTUP_T0)
+
+    def _check_interactive(self):
+        if not self.catalog_loading:
+            self.mark_startup("interactive")
+        if "interactive" not in self.startup_marks or not (
+            {"vlc_ready", "vlc_failed"} & self.startup_marks.keys()
+        ):
+            self.root.after(50, self._check_interactive)
+            return
+        if self.profile_startup:
+            for name, seconds in sorted(self.startup_marks.items(), key=lambda item: item[1]):
+                print(f"{name}: {seconds * 1000:.0f} ms")
+            self.root.destroy()
+
+    def load_background(self):
+        if not os.path.exists(self.bg_image_path):
+            print(f"Image not found: {self.bg_image_path}")
+            return
+        self.bg_scaler = BackgroundScaler(self.root, self.bg_image_path, self.show_background)
+        self.update_background_display()
 
     def update_background_display(self):
-        if not hasattr(self, 'original_image') or not self.original_image:
+        if not getattr(self, 'bg_scaler', None):
             return
         w = self.canvas.winfo_width()
         h = self.canvas.winfo_height()
         if w < 1 or h < 1:
             return
         try:
-            img_resized = self.original_image.resize((w, h), Image.Resampling.LANCZOS)
-        except:
+            photo = self.bg_scaler.get((w, h))
+        except Exception:
+            return
+        if photo is not None:
+            self.show_background(photo)
+
+    def show_background(self, photo):
+        self.mark_startup("background_ready")
+        self.bg_photo = photo
+        if self.canvas.find_withtag("background"):
+            self.canvas.itemconfig("background", image=photo)
             return
-        self.bg_photo = ImageTk.PhotoImage(img_resized)
-        self.canvas.delete("background")
         self.canvas.create_image(0, 0, anchor=tk.NW, image=self.bg_photo, tags="background")
         self.canvas.tag_raise("tv_area")
         self.canvas.tag_raise("ui_element")
@@ -192,6 +870,8 @@ class EpisodePlayerApp:
 
     def redraw_all(self):
         self.update_background_display()
+        if not hasattr(self, 'tv_canvas'):
+            return
         if self.fullscreen_mode:
             w = self.canvas.winfo_width()
             h = self.canvas.winfo_height()
@@ -199,7 +879,7 @@ class EpisodePlayerApp:
             self.tv_canvas.config(width=w, height=h)
             return
         self.update_tv_area()
-        self.show_current_screen()
+        self.layout.relayout()
 
     def setup_tv_area(self):
         self.tv_relx = 0.048
@@ -218,13 +898,19 @@ class EpisodePlayerApp:
         )
         self.tv_scrollbar.place(relx=1.0, rely=0, relheight=1.0, anchor='ne')
 
-        self.tv_scrollable_canvas.configure(yscrollcommand=self.tv_scrollbar.set)
-
         self.tv_inner_frame = tk.Frame(self.tv_scrollable_canvas, bg="#4e4e4e")
         self.tv_inner_frame_id = self.tv_scrollable_canvas.create_window((0, 0), window=self.tv_inner_frame, anchor=tk.NW)
 
+        self.tv_list = VirtualEpisodeList(self.tv_scrollable_canvas, self.text_color, self.hover_color)
+
+        def on_yview(first, last):
+            self.tv_scrollbar.set(first, last)
+            self.tv_list.refresh()
+
+        self.tv_scrollable_canvas.configure(yscrollcommand=on_yview)
+
         def on_frame_configure(event):
-            self.tv_scrollable_canvas.configure(scrollregion=self.tv_scrollable_canvas.bbox("all"))
+            self.tv_list.set_top(event.height)
 
         self.tv_inner_frame.bind("<Configure>", on_frame_configure)
 
@@ -242,13 +928,12 @@ class EpisodePlayerApp:
         search_entry.pack(side="left", padx=5)
 
         def on_search_change(*args):
-            self.search_episode_by_number()
+            if self._search_job:
+                self.root.after_cancel(self._search_job)
+            self._search_job = self.root.after(150, self.search_episode_by_number)
 
         self.search_var.trace_add("write", on_search_change)
 
-        self.tv_list_frame = tk.Frame(self.tv_inner_frame, bg="#4e4e4e")
-        self.tv_list_frame.pack(fill="both", expand=True)
-
         style = ttk.Style()
         style.theme_use('clam')
         style.configure("Vertical.TScrollbar",
@@ -284,26 +969,23 @@ class EpisodePlayerApp:
             self.stop_video()
             self.tv_scrollable_canvas.place(relx=0, rely=0, relwidth=1, relheight=1)
         self.current_screen = 'main'
-        self.canvas.delete("ui_element")
+        self.layout.delete("ui_element")
         self.ui_elements.clear()
 
-        w = self.canvas.winfo_width()
-        h = self.canvas.winfo_height()
-
         font_title = (self.font_name, 36, "bold")
         font_button = (self.font_name, 24, "bold")
 
-        self.canvas.create_text(
-            w * 0.75, h * 0.15, text="KIEPSKIE GUI", font=font_title,
+        self.layout.create_text(
+            0.75, 0.15, font_title, text="KIEPSKIE GUI",
             fill=self.text_color, anchor=tk.CENTER, tags=("ui_element",)
         )
 
-        labels = ["WYBÓR ODCINKA", "WYBÓR SEZONU", "LOSOWY ODCINEK"]
-        tags = ["button_odcinka", "button_sezonu", "button_losowy"]
+        labels = ["KONTYNUUJ", "WYBÓR ODCINKA", "WYBÓR SEZONU", "LOSOWY ODCINEK", "SPRAWDŹ LINKI", "POBIERANIE"]
+        tags = ["button_kontynuuj", "button_odcinka", "button_sezonu", "button_losowy", "button_linki", "button_pobierz"]
+        step = min(0.12, 0.5 / len(labels))
         for i, (label, tag) in enumerate(zip(labels, tags)):
-            y = h * 0.4 + i * h * 0.12
-            self.canvas.create_text(
-                w * 0.75, y, text=label, font=font_button,
+            self.layout.create_text(
+                0.75, 0.4 + i * step, font_button, text=label,
                 fill=self.text_color, anchor=tk.CENTER,
                 tags=("ui_element", "clickable_text", tag)
             )
@@ -329,6 +1011,12 @@ class EpisodePlayerApp:
             self.show_all_episodes()
         elif "button_losowy" in tags:
             self.play_random_episode()
+        elif "button_linki" in tags:
+            self.show_link_check()
+        elif "button_pobierz" in tags:
+            self.show_downloads()
+        elif "button_kontynuuj" in tags:
+            self.show_continue_watching()
 
     def show_season_list(self):
         if not self.fullscreen_mode:
@@ -338,16 +1026,16 @@ class EpisodePlayerApp:
         self.clear_tv_list()
         if not self.load_data_if_needed():
             return
-        font = (self.font_name, 14, "bold")
-        for idx, season in enumerate(self.seasons_data.keys()):
-            lbl = tk.Label(
-                self.tv_list_frame, text=season, font=font,
-                fg=self.text_color, bg="#4e4e4e", anchor="w", justify="left", cursor="hand2"
-            )
-            lbl.pack(fill="x", padx=5, pady=2)
-            lbl.bind("<Enter>", lambda e, l=lbl: l.config(fg=self.hover_color))
-            lbl.bind("<Leave>", lambda e, l=lbl: l.config(fg=self.text_color))
-            lbl.bind("<Button-1>", lambda e, s=season: self.show_episode_list(s))
+        self.show_season_rows()
+
+    def show_season_rows(self, keep_view=False):
+        seasons = list(self.catalog.seasons)
+        self.tv_list.set_rows(
+            seasons, (self.font_name, 14, "bold"),
+            lambda row: self.show_episode_list(seasons[row]),
+            note=self.loading_note(), keep_view=keep_view,
+            on_context=lambda row: self.download_episodes(self.catalog.season_episodes(row))
+        )
 
     def show_episode_list(self, season_name):
         if not self.fullscreen_mode:
@@ -356,17 +1044,7 @@ class EpisodePlayerApp:
         self.current_screen = 'episode_list'
         self.current_season_name = season_name
         self.clear_tv_list()
-        episodes = self.seasons_data.get(season_name, [])
-        font = (self.font_name, 12, "bold")
-        for idx, (ep_name, ep_url) in enumerate(episodes):
-            lbl = tk.Label(
-                self.tv_list_frame, text=ep_name, font=font,
-                fg=self.text_color, bg="#4e4e4e", anchor="w", justify="left", cursor="hand2"
-            )
-            lbl.pack(fill="x", padx=5, pady=2)
-            lbl.bind("<Enter>", lambda e, l=lbl: l.config(fg=self.hover_color))
-            lbl.bind("<Leave>", lambda e, l=lbl: l.config(fg=self.text_color))
-            lbl.bind("<Button-1>", lambda e, url=ep_url, name=ep_name: self.play_link(url, name))
+        self.show_episode_rows(self.catalog.season_episodes(season_name))
 
     def show_all_episodes(self):
         if not self.fullscreen_mode:
@@ -376,107 +1054,565 @@ class EpisodePlayerApp:
         self.clear_tv_list()
         if not self.load_data_if_needed():
             return
-        all_episodes = []
-        for eps in self.seasons_data.values():
-            all_episodes.extend(eps)
-        font = (self.font_name, 12, "bold")
-        for idx, (ep_name, ep_url) in enumerate(all_episodes):
-            lbl = tk.Label(
-                self.tv_list_frame, text=ep_name, font=font,
-                fg=self.text_color, bg="#4e4e4e", anchor="w", justify="left", cursor="hand2"
-            )
-            lbl.pack(fill="x", padx=5, pady=2)
-            lbl.bind("<Enter>", lambda e, l=lbl: l.config(fg=self.hover_color))
-            lbl.bind("<Leave>", lambda e, l=lbl: l.config(fg=self.text_color))
-            lbl.bind("<Button-1>", lambda e, url=ep_url, name=ep_name: self.play_link(url, name))
+        self.show_episode_rows(self.catalog.episodes)
+
+    def show_episode_rows(self, episodes, note=None, keep_view=False):
+        episodes = list(episodes)
+        self.tv_list.set_rows(
+            [episode.name for episode in episodes], (self.font_name, 12, "bold"),
+            lambda row: self.play_link(episodes[row].url, episodes[row].name, episodes=episodes, position=row),
+            note=note or self.loading_note(), keep_view=keep_view,
+            colors=[self.dead_color if self.is_dead(episode) else None for episode in episodes],
+            on_context=lambda row: self.download_episodes([episodes[row]]),
+            thumbnails=(lambda row: self.episode_thumbnail(episodes[row])) if self.thumbnails else None,
+            on_hover=(lambda row: self.on_episode_hover(None if row is None else episodes[row])) if self.warmer else None
+        )
+
+    def on_episode_hover(self, episode):
+        # Warm up only once the pointer settles; leaving the row cancels the pending and running warmup
+        if self._hover_job is not None:
+            self.root.after_cancel(self._hover_job)
+            self._hover_job = None
+        if episode is None:
+            self.warmer.cancel()
+            return
+        self._hover_job = self.root.after(self.HOVER_WARMUP_MS, lambda: self.warm_episode(episode))
+
+    def warm_episode(self, episode):
+        self._hover_job = None
+        if not self.downloads.local_path(episode.url):
+            self.warmer.warm(self.sources_for(episode.url)[0])
+
+    def episode_thumbnail(self, episode):
+        # Captures straight from the download or the best mirror, never through the caching proxy
+        local = self.downloads.local_path(episode.url)
+        location = os.path.abspath(local) if local else self.sources_for(episode.url)[0]
+        return self.thumbnails.get(episode.url, location)
+
+    def is_dead(self, episode):
+        # Dead only when every mirror failed its last check
+        for url in episode.urls:
+            result = self.link_health.get(url)
+            if result is None or result["ok"]:
+                return False
+        return True
+
+    def loading_note(self):
+        return "Ładowanie..." if self.catalog_loading else None
 
     def clear_tv_list(self):
-        for widget in self.tv_list_frame.winfo_children():
-            widget.destroy()
+        self.tv_list.clear()
 
-    def search_episode_by_number(self):
-        query = self.search_var.get().strip().lower()
+    def search_episode_by_number(self, keep_view=False):
+        self._search_job = None
         if not self.load_data_if_needed():
             return
-        all_episodes = []
-        for eps in self.seasons_data.values():
-            all_episodes.extend(eps)
-        filtered = []
-        for idx, (name, url) in enumerate(all_episodes, 1):
-            idx_str = str(idx)
-            name_lower = name.lower()
-            if query in idx_str or query in name_lower:
-                filtered.append((name, url))
+        matches = self.search_index.search(self.search_var.get())
+        filtered = [self.catalog[idx] for idx in matches]
         self.current_screen = 'search_results'
+        note = "Brak wyników" if not filtered and not self.catalog_loading else None
+        self.show_episode_rows(filtered, note=note, keep_view=keep_view)
+
+    def download_episodes(self, episodes):
+        for episode in episodes:
+            self.downloads.enqueue(episode.name, episode.url)
+        self.show_downloads()
+
+    def show_continue_watching(self):
+        if not self.fullscreen_mode:
+            self.stop_video()
+            self.tv_scrollable_canvas.place(relx=0, rely=0, relwidth=1, relheight=1)
+        self.current_screen = 'continue'
+        self.show_continue_rows()
+
+    def show_continue_rows(self, keep_view=False):
+        entries = self.history.recent()
+        rows = [f"{entry['name']} — {format_time(entry['position_ms'])}" for url, entry in entries]
+        if not self.history.loaded.is_set():
+            note = "Ładowanie..."
+        else:
+            note = None if entries else "Brak rozpoczętych odcinków"
+        self.tv_list.set_rows(
+            rows, (self.font_name, 12, "bold"),
+            lambda row: self.play_history_entry(*entries[row]),
+            note=note, keep_view=keep_view
+        )
+
+    def _poll_history_loaded(self):
+        # The SQLite load runs on the history thread; pick up its result here without blocking
+        if not self.history.loaded.is_set():
+            self.root.after(100, self._poll_history_loaded)
+            return
+        if self.current_screen == 'continue' and not self.video_playing:
+            self.show_continue_rows(keep_view=True)
+        if self._resume_pending is not None and self._resume_pending == self.current_link and self.video_playing:
+            resume_ms = self.history.resume_position(self._resume_pending)
+            if resume_ms:
+                self._resume_target = (self._resume_pending, resume_ms)
+                self.start_playback_updates()
+        self._resume_pending = None
+
+    def play_history_entry(self, url, entry):
+        episode = self.catalog.by_url(url)
+        if episode is None:
+            self.play_link(url, entry["name"])
+        else:
+            self.play_link(episode.url, episode.name, episodes=self.catalog.episodes, position=episode.index)
+
+    def show_downloads(self):
+        if not self.fullscreen_mode:
+            self.stop_video()
+            self.tv_scrollable_canvas.place(relx=0, rely=0, relwidth=1, relheight=1)
+        self.current_screen = 'downloads'
+        self.show_download_rows()
+        if self._downloads_job is None:
+            self._downloads_job = self.root.after(500, self._update_downloads_screen)
+
+    def show_download_rows(self, keep_view=False):
+        jobs = list(self.downloads.jobs)
+        rows = [self._download_row_text(job) for job in jobs]
+        colors = [self.dead_color if job.status == "error" else None for job in jobs]
+        self.tv_list.set_rows(
+            rows, (self.font_name, 12, "bold"),
+            lambda row: self.play_link(jobs[row].url, jobs[row].name),
+            note=None if jobs else "Prawy klik na odcinku lub sezonie dodaje go do pobierania",
+            keep_view=keep_view, colors=colors
+        )
+
+    def _download_row_text(self, job):
+        if job.status == "done":
+            return f"{job.name} — gotowe"
+        if job.status == "error":
+            return f"{job.name} — błąd: {job.error}"
+        if job.status == "queued" or not job.size:
+            return f"{job.name} — w kolejce"
+        now = time.monotonic()
+        last_time, last_done, speed = self._download_speed.get(job.url, (now, job.done, 0.0))
+        if now - last_time >= 0.5:
+            speed = (job.done - last_done) / (now - last_time)
+            last_time, last_done = now, job.done
+        self._download_speed[job.url] = (last_time, last_done, speed)
+        return f"{job.name} — {job.done * 100 // job.size}% ({speed / 1e6:.1f} MB/s)"
+
+    def _update_downloads_screen(self):
+        # Progress is read from the worker's job objects, never waited on
+        self._downloads_job = None
+        if self.current_screen != 'downloads' or self.video_playing:
+            return
+        self.show_download_rows(keep_view=True)
+        if self.downloads.active():
+            self._downloads_job = self.root.after(500, self._update_downloads_screen)
+
+    def show_link_check(self):
+        if not self.fullscreen_mode:
+            self.stop_video()
+            self.tv_scrollable_canvas.place(relx=0, rely=0, relwidth=1, relheight=1)
+        self.current_screen = 'link_check'
         self.clear_tv_list()
-        if not filtered:
-            lbl = tk.Label(
-                self.tv_list_frame, text="Brak wyników", font=(self.font_name, 12, "bold"),
-                fg="white", bg="#4e4e4e"
-            )
-            lbl.pack(pady=10)
+        if not self.load_data_if_needed():
             return
-        font = (self.font_name, 12, "bold")
-        for idx, (ep_name, ep_url) in enumerate(filtered):
-            lbl = tk.Label(
-                self.tv_list_frame, text=ep_name, font=font,
-                fg=self.text_color, bg="#4e4e4e", anchor="w", justify="left", cursor="hand2"
-            )
-            lbl.pack(fill="x", padx=5, pady=2)
-            lbl.bind("<Enter>", lambda e, l=lbl: l.config(fg=self.hover_color))
-            lbl.bind("<Leave>", lambda e, l=lbl: l.config(fg=self.text_color))
-            lbl.bind("<Button-1>", lambda e, url=ep_url, name=ep_name: self.play_link(url, name))
+        if self.link_checker is None:
+            self.link_checker = LinkChecker()
+            urls = [url for episode in self.catalog.episodes for url in episode.urls]
+            self.link_check_progress = (0, len(urls))
+            threading.Thread(target=self._link_check_worker, args=(self.link_checker, urls), daemon=True).start()
+            self.root.after(200, self._drain_link_check_queue)
+        self.show_link_check_rows()
+
+    def show_link_check_rows(self, keep_view=False):
+        done, total = self.link_check_progress
+        dead = [episode for episode in self.catalog.episodes if self.is_dead(episode)]
+        rows = [f"Sprawdzono: {done}/{total}", f"Martwe: {len(dead)}"] + [episode.name for episode in dead]
+        self.tv_list.set_rows(
+            rows, (self.font_name, 12, "bold"),
+            lambda row: self._play_dead_row(dead, row - 2),
+            note="Sprawdzanie..." if self.link_checker else None, keep_view=keep_view,
+            colors=["white", "white"] + [self.dead_color] * len(dead)
+        )
+
+    def _play_dead_row(self, dead, idx):
+        if idx >= 0:
+            self.play_link(dead[idx].url, dead[idx].name)
+
+    def _link_check_worker(self, checker, urls):
+        def progress(done, total, url, result):
+            self.link_check_queue.put((done, total, url, result))
+        try:
+            checker.check(urls, progress)
+        finally:
+            self.link_check_queue.put(None)
+
+    def _drain_link_check_queue(self):
+        finished = False
+        try:
+            while True:
+                item = self.link_check_queue.get_nowait()
+                if item is None:
+                    finished = True
+                    break
+                done, total, url, result = item
+                self.link_health[url] = result
+                self.link_check_progress = (done, total)
+        except queue.Empty:
+            pass
+        if self.link_checker and self.current_screen != 'link_check':
+            # Left the screen: pending checks return at once, results so far are still saved below
+            self.link_checker.cancel()
+        if finished:
+            self.link_checker = None
+            save_link_health(self.link_health)
+        else:
+            self.root.after(200, self._drain_link_check_queue)
+        if self.current_screen == 'link_check' and not self.video_playing:
+            self.show_link_check_rows(keep_view=True)
 
     def load_data_if_needed(self):
-        if self.seasons_data is None:
-            self.seasons_data = load_links(self.txt_file)
-        return self.seasons_data is not None
+        if not self.catalog and self.catalog_loading:
+            self.tv_list.set_rows([], (self.font_name, 12, "bold"), note=self.loading_note())
+        return bool(self.catalog)
 
-    def play_link(self, link, window_title="Playing Episode"):
+    def _load_catalog_worker(self):
+        # Runs off the Tk thread; results are handed over through catalog_queue
+        try:
+            for file_path in self.catalog_files:
+                if not os.path.exists(file_path):
+                    self.catalog_queue.put(("error", ("Error", f"File '{file_path}' not found.")))
+                    return
+            batch = []
+            for season, episode in iter_catalogs(self.catalog_files):
+                if episode is None and batch:
+                    self.catalog_queue.put(("batch", batch))
+                    batch = []
+                batch.append((season, episode))
+                if len(batch) >= 500:
+                    self.catalog_queue.put(("batch", batch))
+                    batch = []
+            if batch:
+                self.catalog_queue.put(("batch", batch))
+        except Exception as e:
+            self.catalog_queue.put(("error", ("Error Reading File", f"An error occurred: {e}")))
+        finally:
+            self.catalog_queue.put(("done", None))
+
+    def _drain_catalog_queue(self):
+        changed = False
+        try:
+            while True:
+                kind, payload = self.catalog_queue.get_nowait()
+                if kind == "batch":
+                    self._add_catalog_batch(payload)
+                elif kind == "error":
+                    self.catalog_failed = True
+                    messagebox.showerror(*payload)
+                elif kind == "done":
+                    self.catalog_loading = False
+                changed = True
+        except queue.Empty:
+            pass
+        if self.catalog_loading:
+            self.root.after(50, self._drain_catalog_queue)
+        elif not self.catalog and not self.catalog_failed:
+            messagebox.showinfo("Info", "No seasons or episodes found.")
+        if changed:
+            self._refresh_catalog_screen()
+
+    def _add_catalog_batch(self, batch):
+        added = self.catalog.add(batch)
+        self.search_index.add(episode.name for episode in added)
+        if self._pending_random and self.catalog.episodes:
+            self._pending_random = False
+            self.play_random_episode()
+
+    def _refresh_catalog_screen(self):
+        if not hasattr(self, "tv_list") or self.video_playing:
+            return
+        if self.current_screen == 'season_list':
+            self.show_season_rows(keep_view=True)
+        elif self.current_screen == 'episode_list':
+            self.show_episode_rows(self.catalog.season_episodes(self.current_season_name), keep_view=True)
+        elif self.current_screen == 'all_episodes':
+            self.show_episode_rows(self.catalog.episodes, keep_view=True)
+        elif self.current_screen == 'search_results':
+            self.search_episode_by_number(keep_view=True)
+        elif self.current_screen == 'continue':
+            self.show_continue_rows(keep_view=True)
+
+    def get_player(self):
+        # One long-lived player per vlc_instance, embedded once into the TV canvas
+        if self.vlc_player is None:
+            self.vlc_player = self.get_vlc_instance().media_player_new()
+            wid = self.tv_canvas.winfo_id()
+            if os.name == "nt":
+                self.vlc_player.set_hwnd(wid)
+            else:
+                self.vlc_player.set_xwindow(wid)
+            vlc = load_vlc()
+            events = self.vlc_player.event_manager()
+            # Callbacks run on libvlc threads: they only record into PlaybackState
+            state = self.playback
+            handlers = {
+                vlc.EventType.MediaPlayerOpening: lambda e: state.update(state="opening"),
+                vlc.EventType.MediaPlayerPlaying: lambda e: state.update(state="playing"),
+                vlc.EventType.MediaPlayerPaused: lambda e: state.update(state="paused"),
+                vlc.EventType.MediaPlayerStopped: lambda e: state.update(state="stopped"),
+                vlc.EventType.MediaPlayerEndReached: lambda e: state.update(state="ended", ended=True),
+                vlc.EventType.MediaPlayerEncounteredError: lambda e: state.update(state="error", error=True),
+                vlc.EventType.MediaPlayerTimeChanged: lambda e: state.update(time=e.u.new_time),
+                vlc.EventType.MediaPlayerPositionChanged: lambda e: state.update(position=e.u.new_position),
+                vlc.EventType.MediaPlayerLengthChanged: lambda e: state.update(length=e.u.new_length),
+                vlc.EventType.MediaPlayerBuffering: lambda e: state.on_buffering(e.u.new_cache),
+                vlc.EventType.MediaPlayerVout: lambda e: state.on_first_frame(),
+            }
+            for event_type, handler in handlers.items():
+                events.event_attach(event_type, handler)
+        return self.vlc_player
+
+    def play_link(self, link, window_title="Playing Episode", episodes=None, position=None):
+        self.finish_host_session()
+        self.save_position()
+        self._switch_started = time.perf_counter()
         self.clear_tv_list()
-        if self.vlc_player:
-            self.vlc_player.stop()
-        self.vlc_player = self.vlc_instance.media_player_new()
-        media = self.vlc_instance.media_new(link)
-        self.vlc_player.set_media(media)
-        wid = self.tv_canvas.winfo_id()
-        if os.name == "nt":
-            self.vlc_player.set_hwnd(wid)
+        self._window_title = window_title
+        self._play_serial += 1
+        self._play_sources = self.sources_for(link)
+        self._failed_sources = set()
+        source = self._play_sources[0]
+        media = None
+        if self.preloaded and self.preloaded[:2] == (link, source):
+            media = self.preloaded[2]
+        if media is not None:
+            self._switch_kind = "preloaded"
         else:
-            self.vlc_player.set_xwindow(wid)
-        self.vlc_player.play()
+            self._switch_kind = (self.warmer and self.warmer.warm_kind(source)) or "cold"
+        self.preloaded = None
+        # Resuming opens the media at the saved offset, so the watched part is never fetched
+        resume_ms = self.history.resume_position(link)
+        self._resume_target = None
+        self._resume_pending = None if self.history.loaded.is_set() else link
+        if resume_ms:
+            media = None
+        self._history_time = None
+        self.start_source(link, source, start_ms=resume_ms, media=media)
+        if len(self._play_sources) > 1 and not self.sources.is_fresh(self._play_sources):
+            self.race_sources(link, self._play_sources)
+        if episodes is not None:
+            self.play_queue = episodes
+            self.play_queue_pos = position
+        elif not self.play_queue or self.play_queue_pos is None or self.play_queue[self.play_queue_pos].url != link:
+            self.play_queue = []
+            self.play_queue_pos = None
+        self.preload_next_episode()
         self.video_playing = True
         self.tv_scrollable_canvas.place_forget()
         self.tv_scrollbar.place_forget()
         self.controls_frame.pack(side="bottom", fill="x")
-        self.update_seekbar()
+        self.start_playback_updates()
+
+    def start_source(self, link, source, start_ms=0, media=None):
+        player = self.get_player()
+        if media is None:
+            media = self.new_media(source, start_ms)
+        self.current_link = link
+        self.current_source = source
+        # Kept for stats sampling: every get_media() call hands back a new retained reference
+        self.current_media = media
+        player.set_media(media)
+        self.playback.reset("opening")
+        self.telemetry.start(source, self._window_title)
+        if not self.downloads.local_path(source):
+            self._host_session = (urllib.parse.urlsplit(source).hostname, time.perf_counter())
+        player.play()
+
+    def sources_for(self, link):
+        # A finished download beats any mirror; otherwise the fastest known mirror goes first
+        episode = self.catalog.by_url(link)
+        if episode is None or self.downloads.local_path(link):
+            return [link]
+        return self.sources.rank(episode.urls)
+
+    def race_sources(self, link, sources):
+        serial = self._play_serial
+
+        def worker():
+            winner = None
+            try:
+                winner = self.sources.race(sources)
+            except Exception as e:
+                print(f"Error probing sources: {e}")
+            finally:
+                self.source_queue.put((serial, link, winner))
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(100, self._drain_source_queue)
+
+    def _drain_source_queue(self):
+        try:
+            serial, link, winner = self.source_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self._drain_source_queue)
+            return
+        # Switch only while the slower source has not shown a frame yet
+        if serial != self._play_serial or winner is None:
+            return
+        self._play_sources = self.sources.rank(self._play_sources)
+        if winner != self.current_source and self.playback.first_frame_at is None and self.video_playing:
+            print(f"Switching to faster source {urllib.parse.urlsplit(winner).hostname}")
+            self.finish_host_session()
+            self.start_source(link, winner)
+            self.start_playback_updates()
+
+    def fail_over(self, reason, resume_ms):
+        # Resumes the same episode from another mirror at the same timestamp
+        self._failed_sources.add(self.current_source)
+        self.sources.mark_failed(self.current_source)
+        remaining = [source for source in self._play_sources if source not in self._failed_sources]
+        if not remaining:
+            return False
+        print(f"Playback {reason} on {urllib.parse.urlsplit(self.current_source).hostname}, "
+              f"switching to {urllib.parse.urlsplit(remaining[0]).hostname}")
+        self.finish_host_session()
+        self._switch_started = time.perf_counter()
+        self._switch_kind = "failover"
+        self.start_source(self.current_link, remaining[0], start_ms=resume_ms)
+        self.start_playback_updates()
+        return True
+
+    def new_media(self, source, start_ms=0):
+        location = self.media_location(source)
+        options = []
+        if location == source or location.startswith("http://127.0.0.1:"):
+            options += self.host_policy.media_options(source)
+        if start_ms:
+            options.append(f":start-time={start_ms / 1000:.1f}")
+        return self.get_vlc_instance().media_new(location, *options)
+
+    def finish_host_session(self, failed=False):
+        # Feeds how this host behaved into the next play's caching choice. Stall rate is per
+        # wall-clock minute since the first frame, so resumes, seeks and failover offsets don't dilute it.
+        if self._host_session is None:
+            return
+        host, started = self._host_session
+        self._host_session = None
+        first_frame_at = self.playback.first_frame_at
+        if first_frame_at is None:
+            # An error before any frame counts as the slowest start; a switch-away tells us nothing
+            if failed:
+                self.host_policy.record(host, HostCachingPolicy.FAILED_STARTUP_MS, 0, 0)
+            return
+        self.host_policy.record(
+            host, (first_frame_at - started) * 1000, self.playback.stalls, time.perf_counter() - first_frame_at
+        )
+
+    def media_location(self, link):
+        local = self.downloads.local_path(link)
+        if local:
+            return os.path.abspath(local)
+        if self.proxy:
+            return self.proxy.url_for(link)
+        return link
+
+    def next_episode(self):
+        if self.play_queue_pos is None or self.play_queue_pos + 1 >= len(self.play_queue):
+            return None
+        return self.play_queue[self.play_queue_pos + 1]
+
+    def preload_next_episode(self):
+        # Parsing with the network flag fetches the next file's headers while this one plays
+        upcoming = self.next_episode()
+        if upcoming is None:
+            return
+        source = self.sources_for(upcoming.url)[0]
+        media = self.new_media(source)
+        try:
+            media.parse_with_options(load_vlc().MediaParseFlag.network, 10000)
+        except Exception as e:
+            print(f"Error preloading next episode: {e}")
+        self.preloaded = (upcoming.url, source, media)
+
+    def play_next_episode(self):
+        upcoming = self.next_episode()
+        if upcoming is None:
+            return
+        self.play_queue_pos += 1
+        self.play_link(upcoming.url, upcoming.name)
+
+    def report_switch_latency(self, first_frame_at):
+        if self._switch_started is None or first_frame_at is None:
+            return
+        latency = (first_frame_at - self._switch_started) * 1000
+        self.telemetry.first_frame(latency, self._switch_kind)
+        self.switch_latencies[self._switch_kind].append(latency)
+        self._switch_started = None
+        averages = ", ".join(
+            f"{kind} {sum(values) / len(values):.0f} ms (n={len(values)})"
+            for kind, values in sorted(self.switch_latencies.items())
+        )
+        print(f"Episode switch latency: {latency:.0f} ms ({self._switch_kind}); averages: {averages}")
+
+    def _telemetry_tick(self):
+        self._telemetry_job = None
+        if not self.vlc_player or not self.video_playing or not self.playback.is_active():
+            return
+        sample = self.telemetry.sample(self.current_media, self.playback)
+        if self.hud_visible:
+            self.hud_label.config(text=PlaybackTelemetry.format(sample))
+        self._telemetry_job = self.root.after(1000, self._telemetry_tick)
+
+    def toggle_hud(self, event=None):
+        if event is not None and isinstance(event.widget, tk.Entry):
+            return
+        self.hud_visible = not self.hud_visible
+        if self.hud_visible:
+            self.hud_label.config(text=PlaybackTelemetry.format(self.telemetry.last))
+            self.hud_label.place(x=8, y=8, anchor="nw")
+            self.hud_label.lift()
+        else:
+            self.hud_label.place_forget()
 
     def toggle_play_pause(self):
         if self.vlc_player:
-            if self.vlc_player.is_playing():
+            if self.playback.is_active():
                 self.vlc_player.pause()
             else:
+                self.playback.update(state="opening")
                 self.vlc_player.play()
+                self.start_playback_updates()
+
+    def save_position(self, finished=False):
+        # Coalesced in memory; WatchHistory writes the batch to disk from its own thread
+        # Until the history has loaded, writing would shadow the saved offset we may still resume from
+        if self.current_link is None or not self.video_playing or not self.history.loaded.is_set():
+            return
+        episode = self.catalog.by_url(self.current_link)
+        name = episode.name if episode else self._window_title
+        if finished:
+            self.history.finish(self.current_link, name, self.playback.length)
+        elif self.playback.time > 0 and self.playback.state != "ended":
+            self.history.update(self.current_link, name, self.playback.time, self.playback.length)
 
     def stop_video(self):
+        self.finish_host_session()
+        self.save_position()
         if self.vlc_player:
             self.vlc_player.stop()
         self.video_playing = False
         self.controls_frame.pack_forget()
-        self.seek_var.set(0)
+        self.set_seekbar(0)
         if not self.fullscreen_mode:
             self.tv_scrollable_canvas.place(relx=0, rely=0, relwidth=1, relheight=1)
             self.tv_scrollbar.place(relx=1.0, rely=0, relheight=1.0, anchor='ne')
 
     def volume_up(self):
-        if self.vlc_player:
-            vol = self.vlc_player.audio_get_volume()
-            self.vlc_player.audio_set_volume(min(vol + 10, 150))
+        self.input.request_volume(10)
 
     def volume_down(self):
+        self.input.request_volume(-10)
+
+    def apply_volume(self, delta):
         if self.vlc_player:
-            vol = self.vlc_player.audio_get_volume()
-            self.vlc_player.audio_set_volume(max(vol - 10, 0))
+            if self._volume is None or self._volume < 0:
+                self._volume = self.vlc_player.audio_get_volume()
+            self._volume = max(0, min(self._volume + delta, 150))
+            self.vlc_player.audio_set_volume(self._volume)
 
     def toggle_fullscreen(self):
         is_full = self.root.attributes("-fullscreen")
@@ -493,11 +1629,11 @@ class EpisodePlayerApp:
             h = self.canvas.winfo_height()
             self.canvas.coords(self.tv_canvas_window, 0, 0)
             self.tv_canvas.config(width=w, height=h)
-            self.overlay_controls.place(relx=0.5, rely=1.0, anchor="s")
-            self.overlay_controls.lift()
-            self.overlay_controls.after(3000, self.hide_overlay_controls)
+            self.show_overlay_controls()
         else:
+            self.input.cancel_overlay()
             self.overlay_controls.place_forget()
+            self._overlay_visible = False
             self.canvas.pack(fill="both", expand=True)
             self.update_tv_area()
             self.canvas.tag_raise("tv_area")
@@ -513,51 +1649,174 @@ class EpisodePlayerApp:
     def hide_overlay_controls(self):
         if self.fullscreen_mode:
             self.overlay_controls.place_forget()
+            self._overlay_visible = False
 
     def show_overlay_controls(self, event=None):
         if self.fullscreen_mode:
-            self.overlay_controls.place(relx=0.5, rely=1.0, anchor="s")
-            self.overlay_controls.lift()
-            self.overlay_controls.after(3000, self.hide_overlay_controls)
+            if not self._overlay_visible:
+                self.overlay_controls.place(relx=0.5, rely=1.0, anchor="s")
+                self.overlay_controls.lift()
+                self._overlay_visible = True
+            self.input.touch_overlay()
 
     def on_seek(self, value):
-        if self.vlc_player and self.vlc_player.get_length() > 0:
-            pos = float(value) / 1000
-            self.vlc_player.set_position(pos)
-
-    def update_seekbar(self):
-        if self.vlc_player and self.vlc_player.is_playing():
-            try:
-                pos = self.vlc_player.get_position()
-                self.seek_var.set(pos * 1000)
-            except:
-                pass
-        self.root.after(500, self.update_seekbar)
+        # Scale also fires for programmatic updates; only user moves become seeks
+        if abs(float(value) - self._seekbar_value) < 0.5:
+            return
+        self._seekbar_value = float(value)
+        self.input.request_seek_to(float(value) / 1000)
+
+    def on_seek_release(self, event):
+        # Land the drag exactly where it was let go instead of up to one interval later
+        self._seekbar_dragging = False
+        self.input.flush_seek()
+
+    def set_seekbar(self, value):
+        self._seekbar_value = value
+        self.seek_var.set(value)
+
+    def start_playback_updates(self):
+        if self._playback_job is None:
+            self._playback_job = self.root.after(self.PLAYBACK_FRAME_MS, self._playback_tick)
+        if self._telemetry_job is None:
+            self._telemetry_job = self.root.after(1000, self._telemetry_tick)
+
+    def _playback_tick(self):
+        # Reschedules only while something is playing, so paused/stopped costs nothing;
+        # an end or error that lands during apply_playback_state still gets one more frame
+        self._playback_job = None
+        snapshot = self.playback.take()
+        if snapshot:
+            self.apply_playback_state(snapshot)
+        if self.playback.dirty or self.playback.is_active():
+            self.start_playback_updates()
+
+    def apply_playback_state(self, snapshot):
+        self.report_switch_latency(snapshot["first_frame_at"])
+        if self._resume_target and snapshot["length"] > 0:
+            # Playback started before the history loaded; jump to the saved offset once seekable
+            link, resume_ms = self._resume_target
+            self._resume_target = None
+            if link == self.current_link:
+                self.vlc_player.set_time(resume_ms)
+        if not self._seekbar_dragging and snapshot["length"] > 0:
+            self.set_seekbar(round(snapshot["position"] * 1000))
+        if snapshot["time"] and (self._history_time is None or abs(snapshot["time"] - self._history_time) >= 1000):
+            self._history_time = snapshot["time"]
+            self.save_position()
+        if snapshot["ended"]:
+            self.save_position(finished=True)
+        if snapshot["ended"] or snapshot["error"]:
+            self.finish_host_session(failed=snapshot["error"])
+        if snapshot["error"]:
+            if not self.fail_over("error", snapshot["time"]):
+                print("Playback error")
+        elif snapshot["stalls"] >= self.STALL_FAILOVER and len(self._failed_sources) + 1 < len(self._play_sources):
+            self.fail_over("stalling", snapshot["time"])
+        if snapshot["ended"] and self.autoplay_var.get() and self.next_episode() is not None:
+            self.play_next_episode()
 
     def seek_relative(self, seconds):
-        if self.vlc_player:
-            length = self.vlc_player.get_length() / 1000
-            current = self.vlc_player.get_time() / 1000
-            new_time = max(0, min(length, current + seconds))
-            self.vlc_player.set_time(int(new_time * 1000))
+        self.input.request_seek(seconds)
+
+    def apply_seek(self, seconds):
+        # Uses the event-fed playhead, and the previous target while VLC is still catching up
+        length = self.playback.length
+        if not self.vlc_player or length <= 0:
+            return
+        now = time.monotonic()
+        if self._seek_target and now - self._seek_target[1] < 1.0:
+            current = self._seek_target[0]
+        else:
+            current = self.playback.time
+        new_time = max(0, min(length, current + seconds * 1000))
+        self.vlc_player.set_time(int(new_time))
+        self._seek_target = (new_time, now)
+        self.start_playback_updates()
+
+    def apply_seek_to(self, position):
+        length = self.playback.length
+        if not self.vlc_player or length <= 0:
+            return
+        new_time = max(0, min(length, position * length))
+        self.vlc_player.set_time(int(new_time))
+        self._seek_target = (new_time, time.monotonic())
+        self.start_playback_updates()
 
     def play_random_episode(self):
-        if not self.load_data_if_needed():
+        episodes = self.catalog.episodes
+        if not episodes and self.catalog_loading:
+            self._pending_random = True
+            self.load_data_if_needed()
             return
-        all_episodes = [(n, l) for eps in self.seasons_data.values() for n, l in eps]
-        if not all_episodes:
+        if not episodes:
             messagebox.showinfo("Info", "Brak odcinków do losowania.")
             return
-        selected_name, selected_link = random.choice(all_episodes)
-        self.play_link(selected_link, window_title=f"(Losowy) {selected_name}")
+        # Rejection sampling keeps the common case O(1) instead of filtering the catalog
+        for _ in range(20):
+            selected = random.choice(episodes)
+            if not self.is_dead(selected):
+                break
+        else:
+            alive = [episode for episode in episodes if not self.is_dead(episode)]
+            selected = random.choice(alive) if alive else random.choice(episodes)
+        self.play_link(
+            selected.url, window_title=f"(Losowy) {selected.name}",
+            episodes=episodes, position=selected.index
+        )
 
-if __name__ == "__main__":
-    if not os.path.exists("links.txt"):
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kiepskie GUI")
+    parser.add_argument("--catalog", action="append", help="episode list to load; repeat to merge mirrors (default: links.txt)")
+    parser.add_argument("--check-links", action="store_true", help="check every episode URL and exit")
+    parser.add_argument("--workers", type=int, default=16, help="concurrent link checks")
+    parser.add_argument("--per-host", type=int, default=4, help="concurrent link checks per host")
+    parser.add_argument("--timeout", type=float, default=10.0, help="link check timeout in seconds")
+    parser.add_argument("--max-download-rate", type=float, default=None, help="download bandwidth cap in KB/s")
+    parser.add_argument("--cache-proxy", action="store_true", help="stream through a local caching proxy")
+    parser.add_argument("--proxy-cache-mb", type=int, default=2048, help="proxy cache size cap in MB")
+    parser.add_argument("--no-warmup", action="store_true", help="do not prefetch the episode under the pointer")
+    parser.add_argument("--thumbnails", action="store_true", help="show preview frames next to episodes")
+    parser.add_argument("--thumbnail-cache-mb", type=int, default=64, help="thumbnail cache size cap in MB")
+    parser.add_argument("--profile-handlers", action="store_true", help="time Tk handlers, warn about slow ones, summarize on exit")
+    parser.add_argument("--frame-budget-ms", type=float, default=50, help="handler time that counts as blocking the UI")
+    parser.add_argument("--profile-dump", help="also write cProfile stats of the UI thread to this file")
+    parser.add_argument("--profile-startup", action="store_true", help="report time-to-first-paint and time-to-interactive, then exit")
+    args = parser.parse_args(argv)
+    catalogs = args.catalog or ["links.txt"]
+
+    if args.check_links:
+        return run_link_check(catalogs, args.workers, args.per_host, args.timeout)
+
+    missing = [path for path in catalogs if not os.path.exists(path)]
+    if missing:
         root_check = tk.Tk()
         root_check.withdraw()
-        messagebox.showerror("Fatal Error", "links.txt not found!")
+        messagebox.showerror("Fatal Error", f"{', '.join(missing)} not found!")
         root_check.destroy()
     else:
+        profiler = None
+        if args.profile_handlers or args.profile_dump:
+            profiler = HandlerProfiler(args.frame_budget_ms, args.profile_dump)
+            profiler.install()
         root = tk.Tk()
-        app = EpisodePlayerApp(root)
+        rate = args.max_download_rate * 1024 if args.max_download_rate else None
+        proxy = CachingProxy(max_bytes=args.proxy_cache_mb * 1024 * 1024) if args.cache_proxy else None
+        app = EpisodePlayerApp(
+            root, catalog_files=catalogs, max_download_rate=rate, proxy=proxy,
+            profile_startup=args.profile_startup, thumbnails=args.thumbnails,
+            thumbnail_cache_mb=args.thumbnail_cache_mb, warmup=not args.no_warmup
+        )
         root.mainloop()
+        if app.link_checker:
+            # The check pool is joined at interpreter exit; without this it would finish every URL first
+            app.link_checker.cancel()
+            save_link_health(app.link_health)
+        app.save_position()
+        app.history.close()
+        if profiler:
+            profiler.finish()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1351 @@
+import os
+import re
+import sys
+import time
+import socket
+import struct
+import http.client
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import hashlib
+import sqlite3
+import logging
+import logging.handlers
+import queue
+import threading
+import unicodedata
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# python-vlc scans libvlc plugins on import; load it on first use
+vlc = None
+_vlc_lock = threading.Lock()
+
+def load_vlc():
+    global vlc
+    with _vlc_lock:
+        if vlc is None:
+            import vlc as vlc_module
+            vlc = vlc_module
+    return vlc
+
+SEASON_PATTERN = re.compile(r"SEZON\s+\d+", re.IGNORECASE)
+URL_PATTERN = re.compile(r"^https?://")
+CATALOG_CACHE_VERSION = 2
+
+def iter_links(lines):
+    # Yields (season, None) for every season header and (season, (name, url, *mirrors)) per episode;
+    # extra URL lines right after an episode's first URL are alternative sources for it
+    current_season = None
+    current_name = None
+    urls = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if URL_PATTERN.match(line):
+            if current_season and current_name:
+                urls.append(line)
+            continue
+        if urls:
+            yield current_season, (current_name, *urls)
+            urls = []
+        current_name = None
+        if SEASON_PATTERN.match(line):
+            current_season = line
+            yield current_season, None
+        else:
+            current_name = line
+    if urls:
+        yield current_season, (current_name, *urls)
+
+def catalog_cache_path(file_path):
+    return file_path + ".cache"
+
+def read_catalog_cache(file_path):
+    try:
+        with open(catalog_cache_path(file_path), "r", encoding="utf-8") as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cache, dict) or cache.get("version") != CATALOG_CACHE_VERSION:
+        return None
+    return cache
+
+def write_catalog_cache(file_path, stat, digest, seasons):
+    cache = {
+        "version": CATALOG_CACHE_VERSION,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha1": digest,
+        "seasons": seasons,
+    }
+    cache_path = catalog_cache_path(file_path)
+    try:
+        with open(cache_path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(cache, file, ensure_ascii=False, separators=(",", ":"))
+        os.replace(cache_path + ".tmp", cache_path)
+    except OSError as e:
+        print(f"Error writing catalog cache: {e}")
+
+def _iter_cached(cache):
+    for season, episodes in cache["seasons"].items():
+        yield season, None
+        for episode in episodes:
+            yield season, tuple(episode)
+
+def iter_catalog(file_path):
+    # The parser only runs when links.txt changed since the cache was written
+    stat = os.stat(file_path)
+    cache = read_catalog_cache(file_path)
+    if cache and cache.get("mtime_ns") == stat.st_mtime_ns and cache.get("size") == stat.st_size:
+        yield from _iter_cached(cache)
+        return
+    with open(file_path, "rb") as file:
+        data = file.read()
+    digest = hashlib.sha1(data).hexdigest()
+    if cache and cache.get("sha1") == digest:
+        items = _iter_cached(cache)
+    else:
+        items = iter_links(data.decode("utf-8").splitlines())
+    seasons = {}
+    for season, episode in items:
+        episodes = seasons.setdefault(season, [])
+        if episode is not None:
+            episodes.append(episode)
+        yield season, episode
+    write_catalog_cache(file_path, stat, digest, seasons)
+
+def iter_catalogs(file_paths):
+    # (None, None) separates files, so EpisodeCatalog only merges mirrors across them
+    for position, file_path in enumerate(file_paths):
+        if position:
+            yield None, None
+        yield from iter_catalog(file_path)
+
+_EPISODE_NUMBER = re.compile(r"^\s*(\d+)")
+
+def _url_key(url):
+    # (interned directory, file name): the URL index shares both strings with Episode
+    prefix, _, filename = url.rpartition("/")
+    return sys.intern(prefix + "/"), filename
+
+class Episode:
+    __slots__ = ("index", "season", "number", "name", "prefix", "filename", "mirrors")
+
+    def __init__(self, index, season, number, name, url, mirrors=()):
+        self.index = index
+        self.season = season
+        self.number = number
+        self.name = name
+        # Hosts and directories repeat across hundreds of episodes; keep one copy of each
+        self.prefix, self.filename = _url_key(url)
+        self.mirrors = tuple(mirrors)
+
+    @property
+    def url(self):
+        return self.prefix + self.filename
+
+    @property
+    def urls(self):
+        return (self.url,) + self.mirrors
+
+class EpisodeCatalog:
+    # Shared, append-only model: episodes in file order with O(1) lookups
+    def __init__(self):
+        self.seasons = []
+        self.episodes = []
+        self._season_index = {}
+        self._season_numbers = {}
+        self._season_episodes = []
+        self._by_url = {}
+        self._by_number = {}
+        self._by_key = {}
+        self._file = 0
+
+    @classmethod
+    def from_items(cls, items):
+        catalog = cls()
+        catalog.add(items)
+        return catalog
+
+    def add_season(self, season):
+        if season not in self._season_index:
+            self._season_index[season] = len(self.seasons)
+            match = re.search(r"\d+", season)
+            if match:
+                self._season_numbers.setdefault(int(match.group()), len(self.seasons))
+            self.seasons.append(season)
+            self._season_episodes.append([])
+        return self._season_index[season]
+
+    def add_episode(self, season, name, url, *mirrors):
+        # The same season and episode number in a later catalog file only contributes mirrors;
+        # returns None in that case. Repeats within one file stay separate episodes.
+        season_idx = self.add_season(season)
+        match = _EPISODE_NUMBER.match(name)
+        key = (season_idx, int(match.group(1)) if match else name)
+        existing, file = self._by_key.get(key, (None, None))
+        if existing is not None and file != self._file:
+            new = [u for u in (url,) + mirrors if u not in existing.urls]
+            existing.mirrors += tuple(new)
+            for u in new:
+                self._by_url.setdefault(_url_key(u), existing)
+            return None
+        number = int(match.group(1)) if match else len(self.episodes) + 1
+        episode = Episode(len(self.episodes), season_idx, number, name, url, [u for u in dict.fromkeys(mirrors) if u != url])
+        self.episodes.append(episode)
+        self._season_episodes[season_idx].append(episode)
+        self._by_key.setdefault(key, (episode, self._file))
+        self._by_url.setdefault((episode.prefix, episode.filename), episode)
+        for u in episode.mirrors:
+            self._by_url.setdefault(_url_key(u), episode)
+        self._by_number.setdefault(number, episode)
+        return episode
+
+    def add(self, items):
+        added = []
+        for season, episode in items:
+            if season is None:
+                self._file += 1
+            elif episode is None:
+                self.add_season(season)
+            else:
+                episode = self.add_episode(season, *episode)
+                if episode is not None:
+                    added.append(episode)
+        return added
+
+    def __len__(self):
+        return len(self.episodes)
+
+    def __getitem__(self, index):
+        return self.episodes[index]
+
+    def __bool__(self):
+        return bool(self.seasons)
+
+    def season_episodes(self, season):
+        if isinstance(season, str):
+            season = self._season_index.get(season)
+            if season is None:
+                return []
+        return self._season_episodes[season]
+
+    def get(self, season_number, position):
+        season = self._season_numbers.get(season_number)
+        if season is None:
+            return None
+        episodes = self._season_episodes[season]
+        return episodes[position - 1] if 0 < position <= len(episodes) else None
+
+    def by_number(self, number):
+        return self._by_number.get(number)
+
+    def by_url(self, url):
+        return self._by_url.get(_url_key(url))
+
+def load_catalog(*file_paths):
+    return EpisodeCatalog.from_items(iter_catalogs(file_paths))
+
+LINK_HEALTH_FILE = "link_health.json"
+
+def _content_length(headers):
+    content_range = headers.get("Content-Range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    length = headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)$")
+
+def _content_range(headers):
+    match = _CONTENT_RANGE.match(headers.get("Content-Range") or "")
+    if match is None:
+        return None
+    start, end, total = match.groups()
+    return int(start), int(end), None if total == "*" else int(total)
+
+def check_link(url, timeout=10.0):
+    # HEAD first; hosts that refuse it get a one-byte ranged GET instead
+    start = time.perf_counter()
+    status = None
+    length = None
+    error = None
+    for method, headers in (("HEAD", {}), ("GET", {"Range": "bytes=0-0"})):
+        try:
+            request = urllib.request.Request(url, method=method, headers=headers)
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                status = response.status
+                length = _content_length(response.headers)
+            error = None
+        except urllib.error.HTTPError as e:
+            status = e.code
+            error = f"HTTP {e.code}"
+            if e.code in (403, 405, 501):
+                continue
+        except (urllib.error.URLError, socket.timeout, OSError) as e:
+            error = str(getattr(e, "reason", None) or e)
+        except (http.client.HTTPException, ValueError) as e:
+            # Malformed catalog URLs fail the same way as unreachable ones
+            error = f"{type(e).__name__}: {e}"
+        break
+    return {
+        "status": status,
+        "ok": status in (200, 206),
+        "content_length": length,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        "error": error,
+        "checked_at": time.time(),
+    }
+
+class LinkChecker:
+    def __init__(self, workers=16, per_host=4, timeout=10.0):
+        self.workers = workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.cancelled = False
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def _host_limit(self, url):
+        host = urllib.parse.urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def _check(self, url):
+        if self.cancelled:
+            return None
+        with self._host_limit(url):
+            if self.cancelled:
+                return None
+            return check_link(url, self.timeout)
+
+    def check(self, urls, progress=None):
+        urls = list(dict.fromkeys(urls))
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._check, url): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                result = future.result()
+                if result is None:
+                    continue
+                results[url] = result
+                if progress:
+                    progress(len(results), len(urls), url, result)
+        return results
+
+    def cancel(self):
+        self.cancelled = True
+
+def load_link_health(path=LINK_HEALTH_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def save_link_health(results, path=LINK_HEALTH_FILE):
+    try:
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=1)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"Error writing link health: {e}")
+
+def run_link_check(file_paths, workers, per_host, timeout):
+    try:
+        catalog = load_catalog(*file_paths)
+    except Exception as e:
+        print(f"Error reading {', '.join(file_paths)}: {e}")
+        return 2
+    names = {url: episode.name for episode in catalog.episodes for url in episode.urls}
+    health = load_link_health()
+    dead = []
+
+    def progress(done, total, url, result):
+        if not result["ok"]:
+            dead.append(url)
+            print(f"[{done}/{total}] DEAD {result['error'] or result['status']}: {names[url]} ({url})")
+        elif done % 50 == 0 or done == total:
+            print(f"[{done}/{total}] checked")
+
+    health.update(LinkChecker(workers, per_host, timeout).check(names, progress))
+    save_link_health(health)
+    print(f"Checked {len(names)} links: {len(names) - len(dead)} ok, {len(dead)} dead")
+    return 1 if dead else 0
+
+class SourceSelector:
+    # Races cheap probes across an episode's mirrors and remembers who answered, and how fast
+    FRESH_SECONDS = 300
+
+    def __init__(self, health=None, timeout=3.0):
+        self.health = health if health is not None else {}
+        self.timeout = timeout
+        self.results = {}
+        self._lock = threading.Lock()
+
+    def record(self, url, result):
+        with self._lock:
+            self.results[url] = result
+
+    def mark_failed(self, url):
+        self.record(url, {"ok": False, "latency_ms": None, "checked_at": time.time()})
+
+    def _result(self, url):
+        with self._lock:
+            return self.results.get(url) or self.health.get(url)
+
+    def rank(self, urls):
+        # Known-good by latency, then untested in catalog order, then known-bad
+        def key(item):
+            position, url = item
+            result = self._result(url)
+            if result is None:
+                return (1, 0, position)
+            if result["ok"]:
+                return (0, result["latency_ms"] or 0, position)
+            return (2, 0, position)
+        return [url for _, url in sorted(enumerate(urls), key=key)]
+
+    def is_fresh(self, urls):
+        now = time.time()
+        with self._lock:
+            return all(url in self.results and now - self.results[url]["checked_at"] < self.FRESH_SECONDS for url in urls)
+
+    def race(self, urls):
+        # Returns the first mirror to answer a probe successfully; slower probes still get recorded
+        pool = ThreadPoolExecutor(max_workers=len(urls))
+        futures = {}
+        for url in urls:
+            future = pool.submit(check_link, url, self.timeout)
+            future.add_done_callback(lambda f, url=url: f.exception() or self.record(url, f.result()))
+            futures[future] = url
+        try:
+            for future in as_completed(futures):
+                if future.result()["ok"]:
+                    return futures[future]
+            return None
+        finally:
+            pool.shutdown(wait=False)
+
+DOWNLOAD_DIR = "downloads"
+
+def local_episode_path(url, download_dir=DOWNLOAD_DIR):
+    name = os.path.basename(urllib.parse.urlsplit(url).path)
+    if not name:
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest() + ".mp4"
+    return os.path.join(download_dir, name)
+
+class RateLimiter:
+    # Token bucket shared by every segment of every download
+    def __init__(self, rate=None):
+        self.rate = rate
+        self.allowance = rate or 0
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, amount):
+        if not self.rate:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.allowance = min(self.rate, self.allowance + (now - self.last) * self.rate)
+            self.last = now
+            self.allowance -= amount
+            wait = -self.allowance / self.rate if self.allowance < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+class DownloadJob:
+    def __init__(self, name, url, path):
+        self.name = name
+        self.url = url
+        self.path = path
+        self.size = None
+        self.done = 0
+        self.status = "queued"
+        self.error = None
+
+class DownloadManager:
+    CHUNK = 64 * 1024
+    STATE_INTERVAL = 0.5
+
+    def __init__(self, download_dir=DOWNLOAD_DIR, segments=4, max_rate=None, timeout=30.0):
+        self.download_dir = download_dir
+        self.segments = segments
+        self.limiter = RateLimiter(max_rate)
+        self.timeout = timeout
+        self.jobs = []
+        self.pending = queue.Queue()
+        self._worker = None
+
+    def local_path(self, url):
+        path = local_episode_path(url, self.download_dir)
+        return path if os.path.exists(path) else None
+
+    def enqueue(self, name, url):
+        for job in self.jobs:
+            if job.url == url and job.status in ("queued", "downloading"):
+                return job
+        job = DownloadJob(name, url, local_episode_path(url, self.download_dir))
+        if os.path.exists(job.path):
+            job.status = "done"
+            job.size = job.done = os.path.getsize(job.path)
+            return job
+        self.jobs.append(job)
+        self.pending.put(job)
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+        return job
+
+    def active(self):
+        return any(job.status in ("queued", "downloading") for job in self.jobs)
+
+    def _run(self):
+        while True:
+            job = self.pending.get()
+            job.status = "downloading"
+            try:
+                self._download(job)
+                job.status = "done"
+            except Exception as e:
+                job.status = "error"
+                job.error = str(e)
+                print(f"Download failed: {job.name}: {e}")
+
+    def _probe(self, url):
+        request = urllib.request.Request(url, headers={"Range": "bytes=0-0"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return _content_length(response.headers), response.status == 206
+
+    def _download(self, job):
+        os.makedirs(self.download_dir, exist_ok=True)
+        size, ranged = self._probe(job.url)
+        job.size = size
+        part_path = job.path + ".part"
+        state_path = part_path + ".json"
+        if not size or not ranged:
+            self._download_whole(job, part_path)
+        else:
+            state = self._load_state(state_path, job.url, size)
+            if state is None or not os.path.exists(part_path):
+                step = -(-size // self.segments)
+                state = {"url": job.url, "size": size, "segments": [
+                    [start, min(start + step, size) - 1, 0] for start in range(0, size, step)
+                ]}
+                with open(part_path, "wb") as file:
+                    file.truncate(size)
+            self._download_segments(job, part_path, state_path, state)
+            # The .part file was pre-sized, so only the segment counters say whether every byte arrived
+            received = sum(seg[2] for seg in state["segments"])
+            if received != size:
+                raise IOError(f"size mismatch: expected {size}, got {received}")
+        if job.size and os.path.getsize(part_path) != job.size:
+            raise IOError(f"size mismatch: expected {job.size}, got {os.path.getsize(part_path)}")
+        os.replace(part_path, job.path)
+        if os.path.exists(state_path):
+            os.remove(state_path)
+
+    def _load_state(self, state_path, url, size):
+        try:
+            with open(state_path, "r", encoding="utf-8") as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if state.get("url") != url or state.get("size") != size:
+            return None
+        return state
+
+    def _save_state(self, state_path, state):
+        with open(state_path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(state, file)
+        os.replace(state_path + ".tmp", state_path)
+
+    def _download_segments(self, job, part_path, state_path, state):
+        segments = state["segments"]
+        size = state["size"]
+        job.done = sum(seg[2] for seg in segments)
+        errors = []
+
+        def fetch(seg):
+            start, end, done = seg
+            if start + done > end:
+                return
+            request = urllib.request.Request(job.url, headers={"Range": f"bytes={start + done}-{end}"})
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response, open(part_path, "r+b") as file:
+                    if response.status != 206:
+                        raise IOError(f"server ignored range request (HTTP {response.status})")
+                    # Writing at start + done is only safe if the server sent that offset of the same file
+                    content_range = _content_range(response.headers)
+                    if content_range is None or content_range[0] != start + done or content_range[2] != size:
+                        raise IOError(f"unexpected Content-Range {response.headers.get('Content-Range')!r} "
+                                      f"for bytes {start + done}-{end}/{size}")
+                    file.seek(start + done)
+                    while start + seg[2] <= end:
+                        data = response.read(min(self.CHUNK, end - start - seg[2] + 1))
+                        if not data:
+                            raise IOError("connection closed early")
+                        self.limiter.consume(len(data))
+                        file.write(data)
+                        seg[2] += len(data)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=fetch, args=(seg,), daemon=True) for seg in segments]
+        for thread in threads:
+            thread.start()
+        while threads:
+            threads[0].join(self.STATE_INTERVAL)
+            threads = [thread for thread in threads if thread.is_alive()]
+            job.done = sum(seg[2] for seg in segments)
+            self._save_state(state_path, state)
+        if errors:
+            raise errors[0]
+
+    def _download_whole(self, job, part_path):
+        job.done = 0
+        with urllib.request.urlopen(job.url, timeout=self.timeout) as response, open(part_path, "wb") as file:
+            job.size = _content_length(response.headers)
+            while True:
+                data = response.read(self.CHUNK)
+                if not data:
+                    break
+                self.limiter.consume(len(data))
+                file.write(data)
+                job.done += len(data)
+
+PROXY_CACHE_DIR = "proxy_cache"
+
+class ChunkCache:
+    # Fixed-size byte-range chunks on disk, evicted least recently used first
+    SUFFIX = ".bin"
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total = 0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(self.SUFFIX) and os.path.isfile(path):
+                files.append((os.path.getmtime(path), name, os.path.getsize(path)))
+        for mtime, name, size in sorted(files):
+            self.entries[name] = size
+            self.total += size
+        self._evict()
+
+    def _name(self, url, index):
+        return f"{hashlib.sha1(url.encode('utf-8')).hexdigest()[:20]}_{index}{self.SUFFIX}"
+
+    def has(self, url, index):
+        return self._name(url, index) in self.entries
+
+    def get(self, url, index):
+        name = self._name(url, index)
+        with self.lock:
+            if name not in self.entries:
+                return None
+            self.entries.move_to_end(name)
+        try:
+            with open(os.path.join(self.directory, name), "rb") as file:
+                return file.read()
+        except OSError:
+            with self.lock:
+                self.total -= self.entries.pop(name, 0)
+            return None
+
+    def put(self, url, index, data):
+        name = self._name(url, index)
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path + ".tmp", "wb") as file:
+                file.write(data)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print(f"Error writing {self.directory}: {e}")
+            return
+        with self.lock:
+            self.total += len(data) - self.entries.pop(name, 0)
+            self.entries[name] = len(data)
+            self._evict()
+
+    def _evict(self):
+        while self.total > self.max_bytes and self.entries:
+            name, size = self.entries.popitem(last=False)
+            self.total -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+THUMBNAIL_DIR = "thumbnails"
+THUMBNAIL_SIZE = (96, 54)
+
+class ThumbnailCache(ChunkCache):
+    # One downscaled JPEG per episode URL, same LRU size cap as the proxy chunks
+    SUFFIX = ".jpg"
+
+    def _name(self, url, index=0):
+        return f"{hashlib.sha1(url.encode('utf-8')).hexdigest()[:20]}{self.SUFFIX}"
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        proxy = self.server.proxy
+        url = proxy.urls.get(self.path.strip("/").split("/", 1)[0])
+        if url is None:
+            self.send_error(404)
+            return
+        size = proxy.content_length(url)
+        if size is None:
+            # Upstream does not do ranges; let VLC talk to it directly
+            self.send_response(302)
+            self.send_header("Location", url)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        start, end = 0, size - 1
+        match = re.match(r"bytes=(\d*)-(\d*)", self.headers.get("Range", ""))
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:
+                start = max(size - int(match.group(2)), 0)
+            if start >= size or start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if not send_body:
+            return
+        chunk_size = proxy.chunk_size
+        try:
+            for index in range(start // chunk_size, end // chunk_size + 1):
+                data = proxy.get_chunk(url, index)
+                proxy.read_ahead(url, index)
+                offset = index * chunk_size
+                self.wfile.write(data[max(start - offset, 0):end - offset + 1])
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            print(f"Proxy error for {url}: {e}")
+            self.close_connection = True
+
+class CachingProxy:
+    CHUNK_SIZE = 1024 * 1024
+    READ_AHEAD = 4
+
+    def __init__(self, cache_dir=PROXY_CACHE_DIR, max_bytes=2048 * 1024 * 1024, timeout=15.0):
+        self.cache = ChunkCache(cache_dir, max_bytes)
+        self.chunk_size = self.CHUNK_SIZE
+        self.timeout = timeout
+        self.urls = {}
+        self.sizes = {}
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.read_ahead_queue = queue.Queue()
+        for _ in range(2):
+            threading.Thread(target=self._read_ahead_worker, daemon=True).start()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _ProxyHandler)
+        self.server.daemon_threads = True
+        self.server.proxy = self
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def url_for(self, url):
+        token = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        self.urls[token] = url
+        name = os.path.basename(urllib.parse.urlsplit(url).path) or "episode.mp4"
+        return f"http://127.0.0.1:{self.server.server_address[1]}/{token}/{name}"
+
+    def content_length(self, url):
+        if url not in self.sizes:
+            request = urllib.request.Request(url, headers={"Range": "bytes=0-0"})
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    self.sizes[url] = _content_length(response.headers) if response.status == 206 else None
+            except (urllib.error.URLError, socket.timeout, OSError) as e:
+                print(f"Proxy could not reach {url}: {e}")
+                return None
+        return self.sizes[url]
+
+    def get_chunk(self, url, index):
+        data = self.cache.get(url, index)
+        if data is not None:
+            return data
+        key = (url, index)
+        with self.lock:
+            event = self.inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self.inflight[key] = threading.Event()
+        if not owner:
+            # Someone (usually read-ahead) is already fetching this chunk
+            event.wait(self.timeout)
+            data = self.cache.get(url, index)
+            if data is not None:
+                return data
+        try:
+            data = self._fetch(url, index)
+            self.cache.put(url, index, data)
+            return data
+        finally:
+            if owner:
+                with self.lock:
+                    self.inflight.pop(key, None)
+                event.set()
+
+    def _fetch(self, url, index):
+        start = index * self.chunk_size
+        end = min(start + self.chunk_size, self.sizes[url]) - 1
+        request = urllib.request.Request(url, headers={"Range": f"bytes={start}-{end}"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if response.status != 206:
+                raise IOError(f"upstream ignored range request (HTTP {response.status})")
+            data = response.read()
+        if len(data) != end - start + 1:
+            raise IOError(f"short chunk {index}: {len(data)} bytes")
+        return data
+
+    def read_ahead(self, url, index):
+        last = (self.sizes[url] - 1) // self.chunk_size
+        for ahead in range(index + 1, min(index + self.READ_AHEAD, last) + 1):
+            if not self.cache.has(url, ahead) and (url, ahead) not in self.inflight:
+                self.read_ahead_queue.put((url, ahead))
+
+    def _read_ahead_worker(self):
+        while True:
+            url, index = self.read_ahead_queue.get()
+            try:
+                self.get_chunk(url, index)
+            except Exception:
+                pass
+
+def find_moov(head, total):
+    # Walks top-level MP4 boxes in the first bytes; returns the byte range still needed for moov
+    pos = 0
+    while pos + 8 <= len(head):
+        size, kind = struct.unpack(">I4s", head[pos:pos + 8])
+        if size == 1:
+            if pos + 16 > len(head):
+                break
+            size = struct.unpack(">Q", head[pos + 8:pos + 16])[0]
+        elif size == 0:
+            size = total - pos
+        if size < 8:
+            return None
+        if kind == b"moov":
+            end = pos + size - 1
+            return (len(head), end) if end >= len(head) else None
+        pos += size
+    if pos < total:
+        # moov behind mdat (no faststart): the next box starts where mdat ends
+        return (pos, min(total, pos + ConnectionWarmer.MOOV_LIMIT) - 1)
+    return None
+
+class ConnectionWarmer:
+    # Speculative DNS lookup for the episode the pointer rests on; the header/moov bytes are only
+    # fetched when the caching proxy can keep them for VLC, otherwise a one-byte probe is all we send.
+    # One worker, newest request only and a minimum interval between starts keep scrolling cheap.
+    MOOV_LIMIT = 4 * 1024 * 1024
+    MIN_INTERVAL = 0.5
+    WARM_SECONDS = 600
+    MAX_WARM = 64
+
+    def __init__(self, proxy=None, timeout=10.0):
+        self.proxy = proxy
+        self.timeout = timeout
+        self.warmed = OrderedDict()
+        self.wanted = None
+        self.condition = threading.Condition()
+        self._last_start = 0.0
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def warm(self, url):
+        with self.condition:
+            if url == self.wanted or self.is_warm(url):
+                return
+            self.wanted = url
+            self.condition.notify()
+
+    def cancel(self):
+        with self.condition:
+            self.wanted = None
+
+    def warm_kind(self, url):
+        # "warm" when the proxy holds the header/moov, "dns" when only the lookup and probe ran
+        warmed = self.warmed.get(url)
+        if warmed is None or time.monotonic() - warmed[0] > self.WARM_SECONDS:
+            return None
+        return warmed[1]
+
+    def is_warm(self, url):
+        return self.warm_kind(url) is not None
+
+    def _worker(self):
+        while True:
+            with self.condition:
+                while self.wanted is None:
+                    self.condition.wait()
+                delay = self._last_start + self.MIN_INTERVAL - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+                continue
+            with self.condition:
+                url = self.wanted
+                if url is None:
+                    continue
+                self._last_start = time.monotonic()
+            try:
+                kind = self._warm(url)
+                if kind:
+                    self.warmed[url] = (time.monotonic(), kind)
+                    self.warmed.move_to_end(url)
+                    while len(self.warmed) > self.MAX_WARM:
+                        self.warmed.popitem(last=False)
+            except Exception as e:
+                # The worker is shared by every later warmup; one bad response must not end it
+                print(f"Warmup of {url} failed: {e}")
+            with self.condition:
+                if self.wanted == url:
+                    self.wanted = None
+
+    def _warm(self, url):
+        parts = urllib.parse.urlsplit(url)
+        socket.getaddrinfo(parts.hostname, parts.port or (443 if parts.scheme == "https" else 80),
+                           type=socket.SOCK_STREAM)
+        if self.wanted != url:
+            return None
+        if self.proxy is not None:
+            return "warm" if self._warm_proxy(url) else None
+        return "dns" if check_link(url, self.timeout)["ok"] else None
+
+    def _warm_proxy(self, url):
+        # With the caching proxy on, warmed chunks land in its cache and VLC reads them locally
+        total = self.proxy.content_length(url)
+        if not total:
+            return False
+        head = self.proxy.get_chunk(url, 0)
+        needed = find_moov(head, total)
+        if needed is not None:
+            for index in range(needed[0] // self.proxy.chunk_size, needed[1] // self.proxy.chunk_size + 1):
+                if self.wanted != url:
+                    return False
+                self.proxy.get_chunk(url, index)
+        return True
+
+_FOLD_TABLE = str.maketrans({"ł": "l", "Ł": "l"})
+_NON_WORD = re.compile(r"[\W_]+")
+_LEADING_NUMBER = re.compile(r"^\d+\s*")
+
+def fold_text(text):
+    # Lowercase, strip Polish diacritics and collapse punctuation to single spaces
+    text = unicodedata.normalize("NFKD", text.translate(_FOLD_TABLE).lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _NON_WORD.sub(" ", text).strip()
+
+def _trigrams(text):
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SearchIndex:
+    FUZZY_THRESHOLD = 0.45
+    FUZZY_LIMIT = 30
+
+    def __init__(self, names=()):
+        self.names = []
+        self.titles = []
+        self.numbers = []
+        self.postings = defaultdict(list)
+        self._last_query = None
+        self._last_matches = None
+        self.add(names)
+
+    def add(self, names):
+        for name in names:
+            idx = len(self.names)
+            folded = fold_text(name)
+            self.names.append(folded)
+            self.titles.append(_LEADING_NUMBER.sub("", folded))
+            self.numbers.append(str(idx + 1))
+            for gram in _trigrams(folded):
+                self.postings[gram].append(idx)
+        self._last_query = None
+        self._last_matches = None
+
+    def search(self, query):
+        query = fold_text(query)
+        if not query:
+            self._last_query = None
+            return list(range(len(self.names)))
+        tokens = query.split()
+        # Extending the previous query can only narrow its matches, so refine them
+        if self._last_query and query.startswith(self._last_query):
+            candidates = self._last_matches
+        else:
+            candidates = range(len(self.names))
+        matches = [
+            i for i in candidates
+            if query in self.numbers[i] or all(t in self.names[i] for t in tokens)
+        ]
+        self._last_query = query
+        self._last_matches = matches
+        ranked = sorted(matches, key=lambda i: self._rank(i, query))
+        return ranked + self._fuzzy(query, set(matches))
+
+    def _rank(self, idx, query):
+        if self.numbers[idx] == query:
+            return (0, 0, idx)
+        pos = self.titles[idx].find(query)
+        if pos == 0:
+            return (1, 0, idx)
+        if pos > 0:
+            return (2, pos, idx)
+        if query in self.numbers[idx]:
+            return (4, 0, idx)
+        return (3, 0, idx)
+
+    def _fuzzy(self, query, exclude):
+        if len(query) < 3 or query.isdigit():
+            return []
+        grams = _trigrams(query)
+        counts = defaultdict(int)
+        for gram in grams:
+            for idx in self.postings.get(gram, ()):
+                counts[idx] += 1
+        scored = [
+            (-count / len(grams), idx) for idx, count in counts.items()
+            if idx not in exclude and count / len(grams) >= self.FUZZY_THRESHOLD
+        ]
+        scored.sort()
+        return [idx for score, idx in scored[:self.FUZZY_LIMIT]]
+
+METRICS_FILE = "playback_metrics.jsonl"
+
+class PlaybackTelemetry:
+    # Samples libvlc media stats and appends one JSON line per sample to a rotating log
+    STAT_FIELDS = (
+        "read_bytes", "input_bitrate", "demux_read_bytes", "demux_bitrate", "demux_corrupted",
+        "demux_discontinuity", "decoded_video", "displayed_pictures", "lost_pictures", "lost_abuffers",
+    )
+
+    def __init__(self, path=METRICS_FILE, max_bytes=1024 * 1024, backups=3):
+        self.logger = logging.getLogger("kiepskie.metrics")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if not self.logger.handlers:
+            try:
+                handler = logging.handlers.RotatingFileHandler(
+                    path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+                )
+            except OSError as e:
+                print(f"Error opening metrics log: {e}")
+                handler = logging.NullHandler()
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.logger.addHandler(handler)
+        self.session = None
+        self.last = None
+
+    def start(self, url, name):
+        self.session = {
+            "url": url, "name": name, "host": urllib.parse.urlsplit(url).hostname,
+            "started": time.time(), "ttff_ms": None,
+        }
+        self.last = None
+
+    def first_frame(self, latency_ms, start=None):
+        if self.session is not None:
+            self.session["ttff_ms"] = round(latency_ms)
+            self.session["start"] = start
+
+    def sample(self, media, state):
+        if self.session is None:
+            return None
+        stats = {}
+        if media is not None:
+            raw = load_vlc().MediaStats()
+            try:
+                if media.get_stats(raw):
+                    stats = {name: getattr(raw, name) for name in self.STAT_FIELDS}
+            except Exception:
+                pass
+        sample = dict(self.session)
+        sample.update({
+            "t": time.time(), "state": state.state, "time_ms": state.time,
+            "buffering": round(state.buffering, 1), "stalls": state.stalls,
+        })
+        sample.update(stats)
+        if stats:
+            # libvlc reports bitrates in bytes per microsecond
+            sample["input_kbps"] = round(stats["input_bitrate"] * 8000)
+            sample["demux_kbps"] = round(stats["demux_bitrate"] * 8000)
+            if self.last and "lost_pictures" in self.last:
+                sample["lost_delta"] = stats["lost_pictures"] - self.last["lost_pictures"]
+                sample["displayed_delta"] = stats["displayed_pictures"] - self.last["displayed_pictures"]
+        self.last = sample
+        self.logger.info(json.dumps(sample, ensure_ascii=False))
+        return sample
+
+    @staticmethod
+    def format(sample):
+        if not sample:
+            return "brak danych"
+        lines = [
+            f"host      {sample['host']}",
+            f"state     {sample['state']}  buf {sample['buffering']}%",
+            f"ttff      {sample['ttff_ms'] if sample['ttff_ms'] is not None else '-'} ms",
+            f"stalls    {sample['stalls']}",
+        ]
+        if "input_kbps" in sample:
+            lines += [
+                f"input     {sample['input_kbps']} kb/s",
+                f"demux     {sample['demux_kbps']} kb/s",
+                f"frames    {sample['displayed_pictures']} shown / {sample['lost_pictures']} lost",
+            ]
+        return "\n".join(lines)
+
+HOST_STATS_FILE = "host_stats.json"
+
+class HostCachingPolicy:
+    # Learns per-CDN-host startup latency and stall rate, and sizes VLC's network buffer from them
+    DEFAULT_CACHING_MS = 1000
+    MIN_CACHING_MS = 300
+    MAX_CACHING_MS = 8000
+    FAILED_STARTUP_MS = 10000
+    SMOOTHING = 0.3
+
+    def __init__(self, path=HOST_STATS_FILE):
+        self.path = path
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                self.hosts = json.load(file)
+        except (OSError, ValueError):
+            self.hosts = {}
+
+    def record(self, host, startup_ms, stalls, watched_seconds):
+        if not host:
+            return
+        stats = self.hosts.setdefault(host, {"plays": 0, "startup_ms": startup_ms, "stalls_per_min": 0.0, "stalls": 0})
+        rate = stalls / max(watched_seconds / 60, 1.0)
+        alpha = self.SMOOTHING if stats["plays"] else 1.0
+        stats["startup_ms"] = round((1 - alpha) * stats["startup_ms"] + alpha * startup_ms)
+        stats["stalls_per_min"] = round((1 - alpha) * stats["stalls_per_min"] + alpha * rate, 3)
+        stats["stalls"] += stalls
+        stats["plays"] += 1
+        self.save()
+
+    def save(self):
+        try:
+            with open(self.path + ".tmp", "w", encoding="utf-8") as file:
+                json.dump(self.hosts, file, indent=1)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            print(f"Error writing host stats: {e}")
+
+    def caching_ms(self, host):
+        stats = self.hosts.get(host)
+        if not stats:
+            return self.DEFAULT_CACHING_MS
+        # Quick starters get a small buffer; every stall per minute buys three more seconds
+        caching = 400 + min(stats["startup_ms"], 6000) * 0.4 + stats["stalls_per_min"] * 3000
+        return int(max(self.MIN_CACHING_MS, min(self.MAX_CACHING_MS, caching)))
+
+    def media_options(self, url):
+        host = urllib.parse.urlsplit(url).hostname
+        options = [f":network-caching={self.caching_ms(host)}"]
+        stats = self.hosts.get(host)
+        if stats and stats["stalls_per_min"] > 0:
+            options.append(":http-reconnect")
+        return options
+
+WATCH_HISTORY_FILE = "watch_history.sqlite3"
+
+class WatchHistory:
+    # Playheads live in memory for the UI thread; a writer thread flushes them to SQLite in batches
+    FLUSH_SECONDS = 5.0
+    MIN_RESUME_MS = 10000
+    END_MARGIN_MS = 30000
+
+    def __init__(self, path=WATCH_HISTORY_FILE, flush_seconds=FLUSH_SECONDS):
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self.entries = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.closing = False
+        self.loaded = threading.Event()
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS watch (url TEXT PRIMARY KEY, name TEXT, position_ms INTEGER, "
+            "length_ms INTEGER, finished INTEGER, updated REAL)"
+        )
+        return connection
+
+    def _writer(self):
+        try:
+            connection = self._connect()
+            rows = connection.execute("SELECT url, name, position_ms, length_ms, finished, updated FROM watch")
+            with self.lock:
+                for url, name, position, length, finished, updated in rows:
+                    self.entries.setdefault(url, {
+                        "name": name, "position_ms": position, "length_ms": length,
+                        "finished": bool(finished), "updated": updated,
+                    })
+        except sqlite3.Error as e:
+            print(f"Error opening watch history: {e}")
+            self.loaded.set()
+            return
+        self.loaded.set()
+        while True:
+            self.wakeup.wait(self.flush_seconds)
+            self.wakeup.clear()
+            with self.lock:
+                batch, self.pending = self.pending, {}
+                closing = self.closing
+            if batch:
+                try:
+                    with connection:
+                        connection.executemany(
+                            "INSERT OR REPLACE INTO watch VALUES (?, ?, ?, ?, ?, ?)",
+                            [(url, e["name"], e["position_ms"], e["length_ms"], int(e["finished"]), e["updated"])
+                             for url, e in batch.items()]
+                        )
+                except sqlite3.Error as e:
+                    print(f"Error writing watch history: {e}")
+            if closing:
+                connection.close()
+                return
+
+    def update(self, url, name, position_ms, length_ms, finished=False):
+        entry = {
+            "name": name, "position_ms": int(position_ms), "length_ms": int(length_ms),
+            "finished": finished, "updated": time.time(),
+        }
+        with self.lock:
+            self.entries[url] = entry
+            self.pending[url] = entry
+
+    def finish(self, url, name, length_ms):
+        self.update(url, name, 0, length_ms, finished=True)
+
+    def _resumable(self, entry):
+        if entry["finished"] or entry["position_ms"] < self.MIN_RESUME_MS:
+            return False
+        return not entry["length_ms"] or entry["position_ms"] <= entry["length_ms"] - self.END_MARGIN_MS
+
+    def resume_position(self, url):
+        # Never blocks: before the SQLite load finishes (see loaded) this is simply 0
+        with self.lock:
+            entry = self.entries.get(url)
+        return entry["position_ms"] if entry is not None and self._resumable(entry) else 0
+
+    def recent(self, limit=50):
+        with self.lock:
+            items = [(url, entry) for url, entry in self.entries.items() if self._resumable(entry)]
+        items.sort(key=lambda item: -item[1]["updated"])
+        return items[:limit]
+
+    def close(self, timeout=5.0):
+        with self.lock:
+            self.closing = True
+        self.wakeup.set()
+        self.thread.join(timeout)
+
+class PlaybackState:
+    # Written from libvlc event threads, read once per frame on the Tk thread
+    # Buffering is tracked as a percentage alongside the state, not as a state of its own
+    ACTIVE = ("opening", "playing")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, state="stopped"):
+        with self.lock:
+            self.state = state
+            self.time = 0
+            self.length = 0
+            self.position = 0.0
+            self.buffering = 100.0
+            self.stalls = 0
+            self.ended = False
+            self.error = False
+            self.first_frame_at = None
+            self.dirty = True
+
+    def update(self, **changes):
+        with self.lock:
+            for name, value in changes.items():
+                setattr(self, name, value)
+            self.dirty = True
+
+    def on_buffering(self, percent):
+        with self.lock:
+            if percent < 100 and self.buffering >= 100 and self.first_frame_at is not None:
+                self.stalls += 1
+            self.buffering = percent
+            self.dirty = True
+
+    def on_first_frame(self):
+        with self.lock:
+            if self.first_frame_at is None:
+                self.first_frame_at = time.perf_counter()
+                self.dirty = True
+
+    def take(self):
+        # Coalesces every event since the last frame into one snapshot
+        with self.lock:
+            if not self.dirty:
+                return None
+            snapshot = {
+                "state": self.state, "time": self.time, "length": self.length,
+                "position": self.position, "buffering": self.buffering, "stalls": self.stalls,
+                "ended": self.ended, "error": self.error, "first_frame_at": self.first_frame_at,
+            }
+            self.dirty = False
+            self.ended = False
+            self.error = False
+            return snapshot
+
+    def is_active(self):
+        return self.state in self.ACTIVE
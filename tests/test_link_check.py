@@ -0,0 +1,81 @@
+import os
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kiepscy_core import LinkChecker, check_link
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    # /ok answers HEAD, /missing is a 404, /nohead refuses HEAD but serves a ranged GET
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        if self.path == "/ok":
+            self.send_response(200)
+            self.send_header("Content-Length", "1000")
+        elif self.path == "/nohead":
+            self.send_response(405)
+            self.send_header("Content-Length", "0")
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path == "/nohead" and self.headers.get("Range") == "bytes=0-0":
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes 0-0/2000")
+            self.send_header("Content-Length", "1")
+            self.end_headers()
+            self.wfile.write(b"x")
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+class LinkCheckTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_ok(self):
+        result = check_link(self.base + "/ok", timeout=5)
+        self.assertTrue(result["ok"])
+        self.assertEqual(result["content_length"], 1000)
+
+    def test_not_found(self):
+        result = check_link(self.base + "/missing", timeout=5)
+        self.assertFalse(result["ok"])
+        self.assertEqual(result["status"], 404)
+
+    def test_head_refused_falls_back_to_ranged_get(self):
+        result = check_link(self.base + "/nohead", timeout=5)
+        self.assertTrue(result["ok"])
+        self.assertEqual(result["status"], 206)
+        self.assertEqual(result["content_length"], 2000)
+
+    def test_malformed_url_is_a_failed_result(self):
+        for url in (self.base + "/bad path.mp4", "notaurl"):
+            result = check_link(url, timeout=5)
+            self.assertFalse(result["ok"])
+            self.assertIsNotNone(result["error"])
+
+    def test_checker_survives_malformed_url(self):
+        urls = [self.base + "/ok", self.base + "/bad path.mp4", self.base + "/missing"]
+        results = LinkChecker(workers=4, per_host=2, timeout=5).check(urls)
+        self.assertEqual(set(results), set(urls))
+        self.assertEqual([results[url]["ok"] for url in urls], [True, False, False])
+
+if __name__ == "__main__":
+    unittest.main()